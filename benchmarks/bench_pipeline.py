@@ -0,0 +1,187 @@
+# benchmarks/bench_pipeline.py
+
+"""
+End-to-end benchmark of the scan pipeline on synthetic data.
+
+Times load_data, detect_sensitive_data, every anonymize_dataset method,
+score_compliance, log_scan_history and the report generators, and records per
+stage the best wall time over --repeat runs, throughput (rows/s and MB/s of the
+CSV input) and peak traced memory (one extra run under tracemalloc).
+
+Everything that writes to output/ runs inside a temporary working directory.
+
+    python -m benchmarks.bench_pipeline --rows 50000 --save benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --rows 50000 --compare benchmarks/baseline.json
+
+--compare exits with status 1 when a stage is slower (or uses more memory)
+than the baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_dataset
+from modules.anonymize_data import anonymize_dataset
+from modules.compliance_scoring import score_compliance
+from modules.file_loader import load_data
+from modules.history_logger import log_scan_history
+from modules.pii_detector import detect_sensitive_data, patterns
+from modules.report_generator import generate_csv_report, generate_pdf_report
+
+ANONYMIZE_METHODS = ["mask", "hash", "redact", "fake", "pseudonymize", "spans", "redact_text"]
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_DELTA_SECONDS = 0.005
+RULES = {"max_pii_fields": 3, "allowed_pii_types": ["email"], "anonymization_required": False}
+
+
+def _stages(csv_path):
+    """(name, fn) pairs; each fn takes the shared state dict and may add to it."""
+    def load(state):
+        state["df"] = load_data(csv_path)
+
+    def detect(state):
+        state["results"] = detect_sensitive_data(state["df"])
+
+    def anonymize(method):
+        def run(state):
+            state["anon_report"] = anonymize_dataset(
+                state["df"], state["results"], method_config={label: method for label in patterns})[1]
+        return run
+
+    def score(state):
+        state["score"], state["violations"] = score_compliance(state["results"], RULES)
+
+    stages = [("load_data", load), ("detect_sensitive_data", detect)]
+    stages += [(f"anonymize_dataset[{m}]", anonymize(m)) for m in ANONYMIZE_METHODS]
+    stages += [
+        ("score_compliance", score),
+        ("log_scan_history", lambda s: log_scan_history(
+            s["results"], s["score"], s["violations"], "benchmark", s["anon_report"])),
+        ("generate_csv_report", lambda s: generate_csv_report(s["results"], s["score"], s["violations"])),
+        ("generate_pdf_report", lambda s: generate_pdf_report(s["results"], s["score"], s["violations"])),
+    ]
+    return stages
+
+
+def _run_once(stages, traced=False):
+    state = {}
+    timings = {}
+    for name, fn in stages:
+        if traced:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        fn(state)
+        elapsed = time.perf_counter() - start
+        timings[name] = (tracemalloc.get_traced_memory()[1] - base) if traced else elapsed
+    return timings
+
+
+def run(rows, columns, density, text_length, seed, repeat, memory=True):
+    df = generate_dataset(rows, columns, density, text_length, seed)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            csv_path = os.path.join(tmp, "synthetic.csv")
+            df.to_csv(csv_path, index=False)
+            mb = os.path.getsize(csv_path) / 1e6
+            stages = _stages(csv_path)
+            best = {}
+            for _ in range(repeat):
+                for name, t in _run_once(stages).items():
+                    best[name] = min(t, best.get(name, t))
+            peaks = {}
+            if memory:
+                tracemalloc.start()
+                try:
+                    peaks = _run_once(stages, traced=True)
+                finally:
+                    tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "meta": {
+            "rows": rows, "columns": len(df.columns), "density": density, "text_length": text_length,
+            "seed": seed, "repeat": repeat, "input_mb": round(mb, 3),
+            "python": platform.python_version(), "pandas": pd.__version__, "machine": platform.machine(),
+        },
+        "stages": {
+            name: {
+                "seconds": round(t, 6),
+                "rows_per_s": round(rows / t, 1) if t else None,
+                "mb_per_s": round(mb / t, 3) if t else None,
+                "peak_mb": round(peaks[name] / 1e6, 3) if name in peaks else None,
+            }
+            for name, t in best.items()
+        },
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Return regression messages: stages slower or bigger than baseline by more than tolerance."""
+    regressions = []
+    if {k: current["meta"][k] for k in ("rows", "columns", "density", "text_length", "seed")} != \
+            {k: baseline["meta"].get(k) for k in ("rows", "columns", "density", "text_length", "seed")}:
+        regressions.append("dataset parameters differ from the baseline; comparison is not meaningful")
+    for name, base in baseline["stages"].items():
+        cur = current["stages"].get(name)
+        if cur is None:
+            continue
+        if cur["seconds"] > base["seconds"] * (1 + tolerance) + MIN_DELTA_SECONDS:
+            regressions.append(f"{name}: {cur['seconds']:.3f}s vs {base['seconds']:.3f}s baseline")
+        if cur["peak_mb"] is not None and base.get("peak_mb") is not None \
+                and cur["peak_mb"] > base["peak_mb"] * (1 + tolerance) + 1:
+            regressions.append(f"{name}: peak {cur['peak_mb']:.1f} MB vs {base['peak_mb']:.1f} MB baseline")
+    return regressions
+
+
+def _print(report, baseline=None):
+    print(f"{'stage':<32}{'seconds':>10}{'rows/s':>14}{'MB/s':>10}{'peak MB':>10}{'vs base':>10}")
+    for name, s in report["stages"].items():
+        ratio = ""
+        if baseline and name in baseline["stages"] and baseline["stages"][name]["seconds"]:
+            ratio = f"{s['seconds'] / baseline['stages'][name]['seconds']:.2f}x"
+        peak = f"{s['peak_mb']:.1f}" if s["peak_mb"] is not None else "-"
+        print(f"{name:<32}{s['seconds']:>10.3f}{s['rows_per_s']:>14,.0f}{s['mb_per_s']:>10.2f}{peak:>10}{ratio:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=None)
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--text-length", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--compare", help="compare against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown/growth (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.columns, args.density, args.text_length, args.seed, args.repeat,
+                 memory=not args.no_memory)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print(report, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.save}")
+    if baseline:
+        regressions = compare(report, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        sys.exit(1 if regressions else 0)
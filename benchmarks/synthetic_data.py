@@ -0,0 +1,124 @@
+# benchmarks/synthetic_data.py
+
+"""
+Seeded synthetic datasets for benchmarks.
+
+Columns cycle through every type in pii_detector.patterns, followed by a
+free-text "notes" column; a column of each kind is repeated until the requested
+column count is reached. density is the fraction of cells holding PII (the
+rest get non-PII filler) and text_length the approximate length of notes cells,
+which embed PII of random types at the same density.
+
+    python -m benchmarks.synthetic_data --rows 100000 --out data/synthetic.csv
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from modules.pii_detector import patterns
+
+FIRST_NAMES = ["Abebe", "Hana", "Liya", "Samuel", "Marta", "Yonas", "Sara", "Daniel", "Ruth", "Kebede"]
+LAST_NAMES = ["Tesfaye", "Bekele", "Alemu", "Girma", "Haile", "Tadesse", "Mulugeta", "Kassa"]
+DOMAINS = ["example.com", "mail.et", "corp.org", "uni.edu"]
+FILLER_WORDS = ["order", "shipped", "pending", "review", "account", "updated", "payment", "ticket",
+                "closed", "delivery", "request", "status", "invoice", "support", "refund", "note"]
+FILLER_VALUES = ["n/a", "none", "unknown", "pending", "-", "tbd"]
+
+
+def _digits(rng, n, k):
+    return rng.integers(0, 10, size=(n, k))
+
+
+def _join_digits(rows):
+    return ["".join(map(str, r)) for r in rows]
+
+
+def _luhn_digit(digits):
+    """Check digit that makes digits + it pass the Luhn check."""
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = int(ch)
+        if i % 2 == 0:
+            d = d * 2 - 9 if d > 4 else d * 2
+        total += d
+    return str(-total % 10)
+
+
+def make_values(label, n, rng):
+    """n distinct-ish values that match the pattern of the given PII type."""
+    if label == "email":
+        first = rng.choice(FIRST_NAMES, n)
+        return [f"{f.lower()}.{i}@{d}" for i, (f, d) in enumerate(zip(first, rng.choice(DOMAINS, n)))]
+    if label == "phone":
+        return [f"+2519{d}" for d in _join_digits(_digits(rng, n, 8))]
+    if label == "national_id":
+        letters = rng.integers(ord("A"), ord("Z") + 1, size=(n, 2))
+        return [chr(a) + chr(b) + d for (a, b), d in zip(letters, _join_digits(_digits(rng, n, 8)))]
+    if label == "SSN":
+        return [f"{d[:3]}-{d[3:5]}-{d[5:]}" for d in _join_digits(_digits(rng, n, 9))]
+    if label == "Credit Card":
+        cards = [d + _luhn_digit(d) for d in _join_digits(_digits(rng, n, 15))]
+        return [" ".join(c[i:i + 4] for i in range(0, 16, 4)) for c in cards]
+    if label == "Name":
+        return [f"{f} {l}" for f, l in zip(rng.choice(FIRST_NAMES, n), rng.choice(LAST_NAMES, n))]
+    raise ValueError(f"No generator for PII type: {label}")
+
+
+def _column_name(label, repeat):
+    name = label.lower().replace(" ", "_")
+    return name if repeat == 0 else f"{name}_{repeat}"
+
+
+def _notes(n, density, text_length, rng):
+    labels = list(patterns)
+    pii = {label: make_values(label, n, rng) for label in labels}
+    out = []
+    for i in range(n):
+        words = []
+        length = 0
+        while length < text_length:
+            if rng.random() < density:
+                word = pii[labels[rng.integers(len(labels))]][i]
+            else:
+                word = FILLER_WORDS[rng.integers(len(FILLER_WORDS))]
+            words.append(word)
+            length += len(word) + 1
+        out.append(" ".join(words))
+    return out
+
+
+def generate_dataset(rows=10000, columns=None, density=0.5, text_length=200, seed=0):
+    """
+    DataFrame of rows x columns synthetic values; same arguments give the same data.
+    columns defaults to one column per PII type plus one notes column.
+    """
+    rng = np.random.default_rng(seed)
+    kinds = list(patterns) + ["notes"]
+    columns = len(kinds) if columns is None else columns
+    data = {}
+    for c in range(columns):
+        kind = kinds[c % len(kinds)]
+        repeat = c // len(kinds)
+        if kind == "notes":
+            data[_column_name(kind, repeat)] = _notes(rows, density, text_length, rng)
+            continue
+        values = np.array(make_values(kind, rows, rng), dtype=object)
+        filler = rng.random(rows) >= density
+        values[filler] = rng.choice(FILLER_VALUES, int(filler.sum()))
+        data[_column_name(kind, repeat)] = values
+    return pd.DataFrame(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--columns", type=int, default=None)
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--text-length", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="data/synthetic.csv")
+    args = parser.parse_args()
+    generate_dataset(args.rows, args.columns, args.density, args.text_length, args.seed).to_csv(args.out, index=False)
+    print(f"Wrote {args.rows} rows to {args.out}")
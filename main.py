@@ -2,19 +2,31 @@
 
 import os
 import csv
+import glob
 import json
-from modules.file_loader import load_data
-from modules.pii_detector import detect_sensitive_data
+import argparse
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+# Only pandas-free modules are imported here; pandas, numpy and fpdf are loaded by the
+# code paths that need them, so a small scan without anonymization starts quickly
+from modules.file_loader import load_data, load_arrow_table, SUPPORTED_EXTENSIONS, MEMORY_MAPPED_EXTENSIONS
+from modules.pii_detector import detect_sensitive_data, detect_sensitive_data_arrow, detect_sensitive_data_csv, patterns
 from modules.compliance_scoring import score_compliance
-from modules.report_generator import generate_pdf_report, generate_csv_report
-from modules.anonymize_data import anonymize_dataset
+from modules.report_generator import generate_pdf_report, generate_csv_report, submit_reports, LazyReports
+from modules.pattern_registry import load_custom_patterns
+from modules.history_logger import log_scan_history, log_scan_metrics
+from modules import metrics
 import logging
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
+# Jobs in flight per worker in batch mode; the rest of the inputs wait unsubmitted
+JOBS_PER_WORKER = 2
+# CSV inputs up to this size are scanned without pandas when nothing needs a DataFrame
+LITE_SCAN_MAX_BYTES = 1024 * 1024
+
 def save_results(results, output_path="output/results.csv"):
-    os.makedirs("output", exist_ok=True)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
     with open(output_path, mode='w', newline='') as file:
         writer = csv.DictWriter(file, fieldnames=["column", "pattern", "matches_found"])
         writer.writeheader()
@@ -25,25 +37,119 @@ def load_rules(path="config/rules.json"):
     with open(path, "r") as file:
         return json.load(file)
 
-def main():
-    path = "data/sample_data.csv"
+def main(path="data/sample_data.csv", chunksize=None, incremental=False,
+         pattern_timing=False, profile_dir=None, rules_path="config/rules.json", output_dir="output"):
+    """
+    Scan path; with chunksize set, the file is streamed in chunks instead of loaded whole.
+    With incremental, only CSV blocks that changed since the last run are re-scanned.
+
+    Per-stage metrics of the run are logged as JSON and stored in the scan_metrics
+    table of the history database; pattern_timing and profile_dir are passed to
+    modules.metrics.collect. Returns the metrics record.
+    """
+    summary = scan_file(path, load_rules(rules_path), output_dir, chunksize, incremental,
+                        pattern_timing, profile_dir, report_mode="sync")
+    logging.info(f"Metrics: {json.dumps(summary['metrics'])}")
+    log_scan_metrics(summary["metrics"])
+    logging.info(f"PDF and CSV reports saved to {output_dir}/")
+    return summary["metrics"]
+
+def scan_file(path, rules, output_dir="output", chunksize=None, incremental=False,
+              pattern_timing=False, profile_dir=None, report_mode="sync"):
+    """
+    Scan one input and write its results, reports and anonymized copy into output_dir.
+    Returns {"source", "output_dir", "results", "score", "violations", "anon_report", "metrics", "reports"}.
+
+    report_mode decides when the CSV/PDF reports are rendered, and what "reports" is:
+      - "sync": before returning; {format: path}
+      - "background": on a background thread; a Future resolving to {format: path}
+      - "lazy": only when requested; a LazyReports (call .pdf() / .csv())
+      - "none": not at all; {}
+    """
+    with metrics.collect(source=path, pattern_timing=pattern_timing, profile_dir=profile_dir) as run:
+        results, score, violations, anon_report = _run(path, rules, output_dir, chunksize, incremental)
+        if report_mode == "sync":
+            with metrics.stage("report_csv"):
+                reports = {"csv": generate_csv_report(results, score, violations, output_dir=output_dir)}
+            with metrics.stage("report_pdf"):
+                reports["pdf"] = generate_pdf_report(results, score, violations, output_dir=output_dir)
+        elif report_mode == "background":
+            reports = submit_reports(results, score, violations, output_dir=output_dir)
+        elif report_mode == "lazy":
+            reports = LazyReports(results, score, violations, output_dir=output_dir)
+        elif report_mode == "none":
+            reports = {}
+        else:
+            raise ValueError(f"Unknown report mode: {report_mode}")
+    return {"source": path, "output_dir": output_dir, "results": results, "score": score,
+            "violations": violations, "anon_report": anon_report, "metrics": run.record(), "reports": reports}
+
+def _run(path, rules, output_dir, chunksize, incremental):
     logging.info(f"Scanning file: {path}")
+    metrics.count("bytes_read", os.path.getsize(path))
+
+    for label, reason in load_custom_patterns(rules).items():
+        logging.warning(f"Custom pattern {label} ignored: {reason}")
 
-    df = load_data(path)
-    rules = load_rules()
+    anonymize = rules.get("anonymization_required", False)
+    method_config = {label: "mask" for label in patterns}
+    anonymized_path = os.path.join(output_dir, "anonymized_data.csv")
+    anon_report = None
+    results = None
 
-    # Detect PII
-    results = detect_sensitive_data(df)
-    pii_columns = list(set([r["column"] for r in results]))
+    if incremental:
+        from modules.incremental import scan_incremental
+        with metrics.stage("detect"):
+            results, stats = scan_incremental(path)
+        logging.info(f"Incremental scan: {stats['rescanned']} of {stats['chunks']} chunks re-scanned")
+        metrics.count("chunks_reused", stats["reused"])
+        if anonymize:
+            from modules.stream_scanner import anonymize_file_streaming
+            with metrics.stage("anonymize"):
+                anon_report = anonymize_file_streaming(path, results, output_path=anonymized_path,
+                                                       method_config=method_config)
+    elif chunksize:
+        from modules.stream_scanner import scan_file_streaming
+        # Detect PII (and anonymize) chunk by chunk with constant memory
+        with metrics.stage("stream_scan"):
+            results, anon_report = scan_file_streaming(path, anonymize=anonymize, output_path=anonymized_path,
+                                                       chunksize=chunksize, method_config=method_config)
+    elif not anonymize and path.endswith('.csv') and os.path.getsize(path) <= LITE_SCAN_MAX_BYTES:
+        # Small CSV and no DataFrame needed afterwards: csv module instead of pandas
+        with metrics.stage("detect"):
+            results = _detect_lite(path)
+    elif not anonymize and path.endswith(MEMORY_MAPPED_EXTENSIONS):
+        # Parquet/Feather and no DataFrame needed: scan the memory-mapped Arrow table,
+        # string columns in place (all columns are read: integers can hold card numbers)
+        with metrics.stage("load"):
+            table = load_arrow_table(path)
+        with metrics.stage("detect"):
+            results = detect_sensitive_data_arrow(table)
 
-    # Anonymization
-    if rules.get("anonymization_required", False):
-        df = anonymize_dataset(df.copy(), pii_columns, method="mask")
-        df.to_csv("output/anonymized_data.csv", index=False)
-        logging.info("Anonymized dataset saved to output/anonymized_data.csv")
+    if results is None:
+        with metrics.stage("load"):
+            df = load_data(path)
+
+        # Detect PII
+        with metrics.stage("detect"):
+            results = detect_sensitive_data(df)
+
+        # Anonymization
+        if anonymize:
+            from modules.anonymize_data import anonymize_dataset
+            with metrics.stage("anonymize"):
+                df, anon_report = anonymize_dataset(df, results, method_config=method_config, inplace=True)
+                os.makedirs(output_dir, exist_ok=True)
+                df.to_csv(anonymized_path, index=False)
+            metrics.count("hash_cache_hits", anon_report["hash_cache_hits"])
+            metrics.count("hash_cache_misses", anon_report["hash_cache_misses"])
+
+    if anonymize:
+        logging.info(f"Anonymized dataset saved to {anonymized_path}")
 
     # Compliance scoring
-    score, violations = score_compliance(results, rules)
+    with metrics.stage("score"):
+        score, violations = score_compliance(results, rules, anon_report)
     logging.info(f"Compliance Score: {score}%")
     if violations:
         logging.warning("Violations found:")
@@ -57,15 +163,161 @@ def main():
         logging.info("Sensitive data found:")
         for r in results:
             logging.info(f" - {r['column']} matches {r['pattern']} ({r['matches_found']})")
-        save_results(results)
-        logging.info("Results saved to output/results.csv")
+            metrics.count(f"matches.{r['pattern']}", r["matches_found"])
+        save_results(results, os.path.join(output_dir, "results.csv"))
+        logging.info(f"Results saved to {os.path.join(output_dir, 'results.csv')}")
     else:
         logging.info("No sensitive data found. ✅")
+    return results, score, violations, anon_report
+
+def _detect_lite(path):
+    """detect_sensitive_data_csv, or None when the file needs the pandas loader."""
+    try:
+        return detect_sensitive_data_csv(path)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        logging.debug(f"Lite scan not possible for {path} ({e}); loading with pandas")
+        return None
+
+# ---------- Batch mode ----------
+def expand_inputs(inputs):
+    """Files named by paths, glob patterns ('data/**/*.csv') and directories (searched recursively)."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, _, filenames in os.walk(item):
+                paths.extend(os.path.join(dirpath, f) for f in filenames if f.endswith(SUPPORTED_EXTENSIONS))
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            paths.extend(p for p in glob.glob(item, recursive=True)
+                         if os.path.isfile(p) and p.endswith(SUPPORTED_EXTENSIONS))
+    return sorted(set(os.path.normpath(p) for p in paths))
+
+def output_dir_for(path, root, output_dir="output"):
+    """
+    Per-input output directory: the input's path below root, mirrored under
+    output_dir ('a/b.csv' -> '<output_dir>/a/b.csv/'), so distinct inputs never
+    share a directory.
+    """
+    rel = os.path.relpath(os.path.abspath(path), root)
+    return os.path.join(output_dir, rel)
+
+def _scan_job(job):
+    """Worker entry point; failures are returned so one bad file does not stop the batch."""
+    path, rules, out_dir, chunksize, incremental, report_mode = job
+    try:
+        return scan_file(path, rules, out_dir, chunksize, incremental, report_mode=report_mode)
+    except Exception as e:
+        return {"source": path, "output_dir": out_dir, "error": f"{type(e).__name__}: {e}"}
+
+def _iter_completed(jobs, workers):
+    # A single input is scanned in this process; starting a pool would cost more than the scan
+    if not workers or workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _scan_job(job)
+        return
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while True:
+            for job in jobs:
+                pending.add(pool.submit(_scan_job, job))
+                if len(pending) >= workers * JOBS_PER_WORKER:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def scan_batch(inputs, rules_path="config/rules.json", output_dir="output", workers=None,
+               chunksize=None, incremental=False, log_history=True, reports=True):
+    """
+    Scan every input (see expand_inputs) in a pool of worker processes that is
+    reused across files. Each input writes into its own output_dir_for directory,
+    so concurrent scans never share an output file; history and metrics are
+    written by this process only, as results come in. The CSV/PDF compliance
+    reports are rendered here too, on background threads (submit_reports) while
+    the workers scan on, and are all written before the batch summary; a report
+    that fails to render marks its input as failed. reports=False skips them.
+
+    Writes <output_dir>/batch_summary.csv and returns one summary dict per input
+    (as returned by scan_file, or {"source", "output_dir", "error"} on failure).
+    """
+    paths = expand_inputs(inputs)
+    if not paths:
+        logging.warning("No input files matched.")
+        return []
+    rules = load_rules(rules_path)
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    jobs = [(p, rules, output_dir_for(p, root, output_dir), chunksize, incremental, "none") for p in paths]
+    logging.info(f"Scanning {len(paths)} files with {workers or 1} worker(s)")
+
+    summaries = []
+    for summary in _iter_completed(jobs, workers):
+        if "error" in summary:
+            logging.error(f"{summary['source']}: {summary['error']}")
+        elif log_history:
+            scan_id = log_scan_history(summary["results"], summary["score"], summary["violations"],
+                                       summary["source"], summary["anon_report"])
+            log_scan_metrics(summary["metrics"], scan_id=scan_id)
+        if reports and "error" not in summary:
+            summary["reports"] = submit_reports(summary["results"], summary["score"], summary["violations"],
+                                                output_dir=summary["output_dir"])
+        summaries.append(summary)
+
+    for summary in summaries:
+        if isinstance(summary.get("reports"), Future):
+            try:
+                summary["reports"] = summary["reports"].result()
+            except Exception as e:
+                summary["error"] = f"Report failed: {type(e).__name__}: {e}"
+                logging.error(f"{summary['source']}: {summary['error']}")
+
+    summaries.sort(key=lambda s: s["source"])
+    _write_batch_summary(summaries, os.path.join(output_dir, "batch_summary.csv"))
+    _log_batch_summary(summaries)
+    return summaries
+
+def _write_batch_summary(summaries, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["Source", "Output Dir", "Compliance Score", "Violations", "PII Types",
+                         "Matches Found", "Seconds", "Error"])
+        for s in summaries:
+            if "error" in s:
+                writer.writerow([s["source"], s["output_dir"], "", "", "", "", "", s["error"]])
+                continue
+            writer.writerow([s["source"], s["output_dir"], s["score"], len(s["violations"]),
+                             ", ".join(sorted({r["pattern"] for r in s["results"]})),
+                             sum(r["matches_found"] for r in s["results"]),
+                             s["metrics"]["wall_seconds"], ""])
+
+def _log_batch_summary(summaries):
+    ok = [s for s in summaries if "error" not in s]
+    failed = len(summaries) - len(ok)
+    logging.info(f"Batch summary: {len(ok)} scanned, {failed} failed")
+    if ok:
+        logging.info(f" - average compliance score: {sum(s['score'] for s in ok) / len(ok):.2f}%")
+        logging.info(f" - files with violations: {sum(1 for s in ok if s['violations'])}")
+        logging.info(f" - files with PII: {sum(1 for s in ok if s['results'])}")
 
-    # Generate reports
-    generate_csv_report(results, score, violations)
-    generate_pdf_report(results, score, violations)
-    logging.info("PDF and CSV reports saved to output/")
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scan files for PII and check compliance.")
+    parser.add_argument("inputs", nargs="*", default=["data/sample_data.csv"],
+                        help="files, glob patterns or directories")
+    parser.add_argument("--rules", default="config/rules.json", help="compliance rules JSON")
+    parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes for batch scans (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=None, help="stream inputs in chunks of this many rows")
+    parser.add_argument("--incremental", action="store_true", help="re-scan only changed CSV blocks")
+    parser.add_argument("--no-history", action="store_true", help="do not write scan history")
+    parser.add_argument("--no-reports", action="store_true", help="do not render the CSV/PDF compliance reports")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
+    args = _parse_args()
+    scan_batch(args.inputs, args.rules, args.output_dir, args.workers, args.chunksize,
+               args.incremental, log_history=not args.no_history, reports=not args.no_reports)
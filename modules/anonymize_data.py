@@ -8,160 +8,404 @@ Advanced anonymization utilities:
 - anonymization reporting for dashboard statistics
 """
 
+import contextvars
 import hashlib
+from functools import lru_cache, wraps
+import numpy as np
 import pandas as pd
-import os
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from modules.mapping_store import MappingStore, open_mapping_store, JSON_MAP_PATH
+from modules.findings import FindingsIndex, build_findings_index, anonymize_spans
+from modules.text_redactor import redact_text_series, redaction_patterns
 
 # Where to persist the deterministic mapping (optional)
-ANON_MAP_PATH = "output/anonymization_map.json"
+ANON_MAP_BACKEND = "sqlite"     # "sqlite" (indexed) or "json" (legacy file at ANON_MAP_PATH)
+ANON_MAP_PATH = JSON_MAP_PATH
+
+# Max distinct (value, salt, method) digests kept in memory per process
+DIGEST_CACHE_SIZE = 1_000_000
+
+
+# Digest lookups and cache misses of the anonymize_dataset call running in this
+# thread; the process-wide cache_info() would mix in concurrent calls
+_digest_tally: "contextvars.ContextVar[Optional[Dict[str, int]]]" = contextvars.ContextVar("digest_tally",
+                                                                                         default=None)
 
 
-def _ensure_output_dir():
-    os.makedirs("output", exist_ok=True)
+@lru_cache(maxsize=DIGEST_CACHE_SIZE)
+def _cached_digest(value: str, salt: str, method: str) -> str:
+    # Only runs on a cache miss
+    tally = _digest_tally.get()
+    if tally is not None:
+        tally["misses"] += 1
+    if method == "det":
+        return hashlib.sha256(f"{value}|{salt}".encode("utf-8")).hexdigest()[:12]
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _digest(value: str, salt: str, method: str) -> str:
+    """
+    Memoized SHA-256 shared by every column and scan in the process.
+    method "det" is the salted short hash behind fake/pseudonymize,
+    method "sha256" is the plain hexdigest behind hash_value_series.
+    """
+    tally = _digest_tally.get()
+    if tally is not None:
+        tally["lookups"] += 1
+    return _cached_digest(value, salt, method)
+
+
+def digest_cache_stats() -> Dict[str, int]:
+    """Cumulative hit/miss counters of the digest cache for this process (all threads)."""
+    info = _cached_digest.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
 
 
 def _det_hash(val: Any, salt: str = "privacy_checker_salt") -> str:
     """Return deterministic short hex for a value + salt."""
-    h = hashlib.sha256(f"{val}|{salt}".encode("utf-8")).hexdigest()
-    return h[:12]
+    return _digest(f"{val}", salt, "det")
 
 
-def _load_map() -> Dict[str, str]:
-    _ensure_output_dir()
-    if os.path.exists(ANON_MAP_PATH):
-        try:
-            with open(ANON_MAP_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+# ---------- Vectorization helpers ----------
+def _result(values: np.ndarray, series: pd.Series) -> pd.Series:
+    """Wrap an object array like Series.apply does (same index, name and dtype inference)."""
+    if len(series) == 0:
+        return pd.Series(dtype=series.dtype, index=series.index, name=series.name)
+    return pd.Series(values, index=series.index, name=series.name).infer_objects()
 
 
-def _save_map(mapping: Dict[str, str]):
-    _ensure_output_dir()
-    with open(ANON_MAP_PATH, "w", encoding="utf-8") as f:
-        json.dump(mapping, f, indent=2, ensure_ascii=False)
+def _string_form(series: pd.Series) -> pd.Series:
+    """str(x) for every non-missing value, NaN where missing; avoids str() calls when possible."""
+    if pd.api.types.is_string_dtype(series.dtype) and series.dtype != object:
+        return series
+    if series.dtype.kind in "iufb":
+        return series.astype(str).where(series.notna())
+    return series.map(str, na_action="ignore")
 
 
-# ---------- Primitive transformations ----------
-def mask_value_series(series: pd.Series, keep_last: int = 0) -> pd.Series:
-    """Replace value content with '*' leaving last keep_last characters."""
-    def mask_one(x):
-        x = "" if pd.isna(x) else str(x)
-        if keep_last > 0 and len(x) > keep_last:
-            return "*" * (len(x) - keep_last) + x[-keep_last:]
-        return "*" * len(x) if x else x
-    return series.astype(str).apply(mask_one)
+def _stars(counts) -> np.ndarray:
+    """'*' * n for every n in counts, building each distinct run of stars only once."""
+    counts = np.asarray(counts, dtype=np.int64)
+    if counts.size == 0:
+        return np.empty(0, dtype=object)
+    uniq, inverse = np.unique(np.maximum(counts, 0), return_inverse=True)
+    table = np.array(["*" * int(n) for n in uniq], dtype=object)
+    return table[inverse]
+
 
+def _tally(counts, codes, uniques, mapped, pii_rows=None):
+    """
+    Add one kernel run to counts: "pii" rows (pii_rows, all rows by default) and
+    "changed" rows among them. Values are compared once per distinct value and
+    weighted by frequency, so no row-wise diff against a copy is needed.
+    """
+    if counts is None:
+        return
+    rows = codes if pii_rows is None else codes[pii_rows]
+    changed = np.asarray(mapped, dtype=object) != np.asarray(uniques, dtype=object)
+    counts["pii"] = counts.get("pii", 0) + len(rows)
+    if len(rows):
+        counts["changed"] = counts.get("changed", 0) + int(np.bincount(rows, minlength=len(uniques))[changed].sum())
 
-def hash_value_series(series: pd.Series, length: int = 10) -> pd.Series:
+
+def _map_unique(series: pd.Series, mask: np.ndarray, fn=None, batch_fn=None,
+                counts: Dict[str, int] = None, pii_rows: np.ndarray = None) -> np.ndarray:
+    """
+    Apply fn to the string form of series[mask], calling it once per distinct value
+    (or batch_fn once with the list of distinct values). Rows outside mask keep
+    their original value. counts/pii_rows (aligned with series[mask]): see _tally.
+    """
+    out = series.to_numpy(dtype=object, copy=True)
+    if mask.any():
+        strings = _string_form(series[mask])
+        codes, uniques = pd.factorize(strings.to_numpy(dtype=object))
+        if batch_fn is not None:
+            mapped = np.array(batch_fn(list(uniques)), dtype=object)
+        else:
+            mapped = np.array([fn(u) for u in uniques], dtype=object)
+        out[mask] = mapped[codes]
+        _tally(counts, codes, uniques, mapped, pii_rows)
+    return out
+
+
+def _on_distinct(strings: pd.Series, kernel, counts: Dict[str, int] = None,
+                 pii_rows: np.ndarray = None) -> np.ndarray:
+    """Run a vectorized kernel over the distinct strings only and broadcast the result back."""
+    codes, uniques = pd.factorize(strings.to_numpy(dtype=object))
+    mapped = kernel(pd.Series(uniques, dtype=object))
+    _tally(counts, codes, uniques, mapped, pii_rows)
+    return mapped[codes]
+
+
+def _not_missing(series: pd.Series) -> np.ndarray:
+    """Rows that are neither missing nor the literal string 'nan'."""
+    rows = series.notna().to_numpy(dtype=bool, copy=True)
+    # Comparing only the non-missing rows keeps pd.NA out of the comparison
+    present = series[rows]
+    if not rows.any() or present.dtype.kind in "iufb":
+        return rows
+    if pd.api.types.infer_dtype(present, skipna=False) != "string":
+        present = present.astype(str)
+    if present.dtype == object:
+        rows[rows] = present.to_numpy() != "nan"
+    else:
+        # String dtypes compare in their own storage instead of building Python strings
+        rows[rows] = (present != "nan").to_numpy(dtype=bool)
+    return rows
+
+
+def _applied_form(series: pd.Series) -> pd.Series:
+    """
+    The values Series.apply passes for series: nullable and Arrow numeric columns
+    as their to_numpy() values (float with NaN once a value is missing).
+    """
+    dtype = series.dtype
+    if (isinstance(dtype, pd.api.extensions.ExtensionDtype) and not isinstance(dtype, pd.CategoricalDtype)
+            and pd.api.types.is_numeric_dtype(dtype)):
+        return pd.Series(series.array.to_numpy(), index=series.index, name=series.name)
+    return series
+
+
+def _map_categories(series: pd.Series, primitive, counts: Dict[str, int] = None) -> pd.Series:
+    """
+    Run primitive over the categories only, like Series.apply on a categorical:
+    the result stays categorical when the categories map one-to-one, otherwise
+    it is the dense mapped values. counts are weighted by category frequency.
+    """
+    categories = pd.Series(series.cat.categories)
+    mapped = primitive(categories)
+    codes = series.cat.codes.to_numpy()
+    if counts is not None:
+        weights = np.bincount(codes[codes >= 0], minlength=len(categories))
+        pii = _not_missing(categories)
+        changed = pii & (mapped.to_numpy(dtype=object) != categories.to_numpy(dtype=object))
+        counts["pii"] = counts.get("pii", 0) + int(weights[pii].sum())
+        counts["changed"] = counts.get("changed", 0) + int(weights[changed].sum())
+    new_categories = pd.Index(mapped)
+    if new_categories.is_unique and not new_categories.hasnans:
+        dtype = pd.CategoricalDtype(new_categories, ordered=series.cat.ordered)
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=series.index, name=series.name)
+    if (codes < 0).any():
+        new_categories = new_categories.insert(len(new_categories), np.nan)
+    return pd.Series(new_categories.take(codes), index=series.index, name=series.name)
+
+
+def _like_apply(primitive):
+    """
+    Give a vectorized primitive the input handling of the per-value Series.apply
+    it replaces: see _applied_form and _map_categories. Empty input keeps its dtype.
+    """
+    @wraps(primitive)
+    def wrapper(series: pd.Series, *args, counts: Dict[str, int] = None, **kwargs) -> pd.Series:
+        if len(series) == 0:
+            return primitive(series, *args, counts=counts, **kwargs)
+        series = _applied_form(series)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return _map_categories(series, lambda s: primitive(s, *args, **kwargs), counts)
+        return primitive(series, *args, counts=counts, **kwargs)
+    return wrapper
+
+
+# ---------- Primitive transformations ----------
+# Every transformation takes an optional counts dict; when given, it adds the
+# number of PII values ("pii": neither missing nor the string 'nan') and how
+# many of them it changed ("changed"), computed while transforming.
+def mask_value_series(series: pd.Series, keep_last: int = 0, counts: Dict[str, int] = None) -> pd.Series:
+    """Replace value content with '*' leaving last keep_last characters."""
+    def kernel(s):
+        lens = s.str.len().to_numpy(dtype=np.int64)
+        if keep_last <= 0:
+            return _stars(lens)
+        keep = lens > keep_last
+        out = _stars(np.where(keep, lens - keep_last, lens))
+        if keep.any():
+            out[keep] = out[keep] + s[keep].str[-keep_last:].to_numpy(dtype=object)
+        return out
+
+    s = series.astype(str)
+    pii_rows = _not_missing(series) if counts is not None else None
+    return _result(_on_distinct(s.where(s.notna(), ""), kernel, counts, pii_rows), s)
+
+
+@_like_apply
+def hash_value_series(series: pd.Series, length: int = 10, counts: Dict[str, int] = None) -> pd.Series:
     def h(x):
-        if pd.isna(x) or str(x) == "nan":
-            return x
-        return hashlib.sha256(str(x).encode()).hexdigest()[:length]
-    return series.apply(h)
+        return _digest(x, "", "sha256")[:length]
+    return _result(_map_unique(series, _not_missing(series), h, counts=counts), series)
 
 
-def redact_series(series: pd.Series, token: str = "REDACTED") -> pd.Series:
-    return series.apply(lambda x: token if pd.notna(x) and str(x) != "nan" else x)
+@_like_apply
+def redact_series(series: pd.Series, token: str = "REDACTED", counts: Dict[str, int] = None) -> pd.Series:
+    values = series.to_numpy(dtype=object)
+    pii = _not_missing(series)
+    if counts is not None:
+        counts["pii"] = counts.get("pii", 0) + int(pii.sum())
+        counts["changed"] = counts.get("changed", 0) + int((values[pii] != token).sum())
+    out = np.where(pii, token, values)
+    return _result(out.astype(object), series)
 
 
 # ---------- Context-aware transformations ----------
-def mask_email_series(series: pd.Series, keep_domain: bool = True, keep_local_chars: int = 1) -> pd.Series:
-    def mask_email(e):
-        if pd.isna(e) or "@" not in str(e):
-            return e
-        local, domain = str(e).split("@", 1)
+@_like_apply
+def mask_email_series(series: pd.Series, keep_domain: bool = True, keep_local_chars: int = 1,
+                      counts: Dict[str, int] = None) -> pd.Series:
+    def kernel(emails):
+        parts = emails.str.split("@", n=1, expand=True)
+        local, domain = parts[0], parts[1]
+        local_len = local.str.len().to_numpy(dtype=np.int64)
         if keep_domain:
-            keep = local[:keep_local_chars] if keep_local_chars > 0 else ""
-            return f"{keep}{'*' * max(len(local) - len(keep), 1)}@{domain}"
+            keep_len = np.minimum(local_len, max(keep_local_chars, 0))
+            keep = local.str[:keep_local_chars].to_numpy(dtype=object) if keep_local_chars > 0 else ""
+            masked = keep + _stars(np.maximum(local_len - keep_len, 1))
         else:
-            return f"{'*' * max(len(local), 3)}@{domain}"
-    return series.apply(mask_email)
-
-
-def mask_phone_series(series: pd.Series, keep_last: int = 3) -> pd.Series:
+            masked = _stars(np.maximum(local_len, 3))
+        return masked + "@" + domain.to_numpy(dtype=object)
+
+    out = series.to_numpy(dtype=object, copy=True)
+    strings = _string_form(series)
+    # .str only on present values: an all-missing object column has no string to infer from
+    present = strings.notna().to_numpy(dtype=bool)
+    has_at = np.zeros(len(strings), dtype=bool)
+    if present.any():
+        has_at[present] = strings[present].str.contains("@", regex=False).to_numpy(dtype=bool)
+    if counts is not None:
+        # Values without '@' are PII values left unchanged
+        counts["pii"] = counts.get("pii", 0) + int((_not_missing(series) & ~has_at).sum())
+    if has_at.any():
+        out[has_at] = _on_distinct(strings[has_at], kernel, counts)
+    return _result(out, series)
+
+
+def _mask_phone_strings(strings: pd.Series, keep_last: int) -> np.ndarray:
+    # str.isdigit() also accepts non-ASCII digits; only ASCII strings take the regex path
+    ascii_rows = strings.str.isascii().to_numpy(dtype=bool)
+    digits = strings.str.replace(r"[^0-9]", "", regex=True).to_numpy(dtype=object, copy=True)
+    if not ascii_rows.all():
+        digits[~ascii_rows] = ["".join(ch for ch in s if ch.isdigit()) for s in strings[~ascii_rows]]
+    digits = pd.Series(digits, dtype=object)
+    n = digits.str.len().to_numpy(dtype=np.int64)
+    long_rows = n > keep_last
+    masked = _stars(np.where(long_rows, n - keep_last, n))
+    if long_rows.any():
+        masked[long_rows] = masked[long_rows] + digits[long_rows].str[-keep_last:].to_numpy(dtype=object)
+        plus = strings.str.strip().str.startswith("+").to_numpy(dtype=bool) & long_rows
+        masked[plus] = "+" + masked[plus]
+    return masked
+
+
+@_like_apply
+def mask_phone_series(series: pd.Series, keep_last: int = 3, counts: Dict[str, int] = None) -> pd.Series:
     """Keep country code if present, mask middle digits, keep last keep_last digits."""
-    def mask_phone(p):
-        if pd.isna(p):
-            return p
-        s = str(p)
-        digits = "".join(ch for ch in s if ch.isdigit())
-        if len(digits) <= keep_last:
-            return "*" * len(digits)
-        masked = "*" * (len(digits) - keep_last) + digits[-keep_last:]
-        return ("+" + masked) if s.strip().startswith("+") else masked
-    return series.apply(mask_phone)
+    out = series.to_numpy(dtype=object, copy=True)
+    notna = series.notna().to_numpy()
+    if notna.any():
+        pii_rows = _not_missing(series)[notna] if counts is not None else None
+        out[notna] = _on_distinct(_string_form(series[notna]), lambda s: _mask_phone_strings(s, keep_last),
+                                  counts, pii_rows)
+    return _result(out, series)
 
 
 # ---------- Deterministic pseudonymization ----------
-def pseudonymize_series(series: pd.Series, prefix: str = "USER", persist_map: bool = True) -> pd.Series:
+@_like_apply
+def pseudonymize_series(series: pd.Series, prefix: str = "USER", persist_map: bool = True,
+                        store: MappingStore = None, counts: Dict[str, int] = None) -> pd.Series:
     """
     Replace values with deterministic pseudonyms like USER_<shorthash>.
-    If persist_map True, mapping is saved to ANON_MAP_PATH and reused.
+    If persist_map True, mapping is saved to the mapping store (ANON_MAP_BACKEND
+    unless store is given) and reused. Only the column's distinct values are
+    looked up, and only keys not yet stored are inserted.
     """
-    mapping = _load_map() if persist_map else {}
-    updated = False
+    if persist_map and store is None:
+        store = open_mapping_store(ANON_MAP_BACKEND)
+
+    def pseudo_batch(values):
+        keys = [f"{prefix}|{x}" for x in values]
+        known = store.get_many(keys) if persist_map else {}
+        new = {}
+        result = []
+        for x, key in zip(values, keys):
+            value = known.get(key)
+            if value is None:
+                value = f"{prefix}_{_det_hash(x)}"
+                new[key] = value
+            result.append(value)
+        if persist_map and new:
+            store.put_many(new)
+        return result
+
+    return _result(_map_unique(series, _not_missing(series), batch_fn=pseudo_batch, counts=counts), series)
 
-    def pseudo(x):
-        nonlocal updated
-        if pd.isna(x):
-            return x
-        key = f"{prefix}|{x}"
-        if key in mapping:
-            return mapping[key]
-        short = _det_hash(x)
-        value = f"{prefix}_{short}"
-        mapping[key] = value
-        updated = True
-        return value
 
-    result = series.apply(lambda x: pseudo(x) if pd.notna(x) and str(x) != "nan" else x)
-
-    if persist_map and updated:
-        _save_map(mapping)
-
-    return result
+# ---------- Fake (template) generators ----------
+def _fake_series(series, fake, counts):
+    notna = series.notna().to_numpy()
+    pii_rows = _not_missing(series)[notna] if counts is not None else None
+    return _result(_map_unique(series, notna, fake, counts=counts, pii_rows=pii_rows), series)
 
 
-# ---------- Fake (template) generators ----------
-def fake_email_series(series: pd.Series, domain_default: str = "example.com") -> pd.Series:
+@_like_apply
+def fake_email_series(series: pd.Series, domain_default: str = "example.com",
+                      counts: Dict[str, int] = None) -> pd.Series:
     def fake(e):
-        if pd.isna(e):
-            return e
         return f"user{_det_hash(e)[:6]}@{domain_default}"
-    return series.apply(fake)
+    return _fake_series(series, fake, counts)
 
 
-def fake_phone_series(series: pd.Series, country_prefix: str = "+251") -> pd.Series:
+@_like_apply
+def fake_phone_series(series: pd.Series, country_prefix: str = "+251", counts: Dict[str, int] = None) -> pd.Series:
     def fake(p):
-        if pd.isna(p):
-            return p
         return f"{country_prefix}{_det_hash(p)[-9:]}"
-    return series.apply(fake)
+    return _fake_series(series, fake, counts)
 
 
 # ---------- High-level orchestrator ----------
 def anonymize_dataset(df: pd.DataFrame, detections: List[Dict[str, Any]], method_config: Dict[str, str] = None,
-                      persist_map: bool = True):
+                      persist_map: bool = True, map_store: MappingStore = None, findings: FindingsIndex = None,
+                      inplace: bool = False):
     """
+    map_store overrides the backend used to persist pseudonyms (see modules.mapping_store).
+
+    With inplace, the anonymized columns replace df's own columns and df itself
+    is returned; no copy of the frame is made. PII and changed counts come from
+    the transformations themselves (see the counts argument of the primitives).
+
+    Method "spans" masks only the matched spans inside the matched cells, using
+    findings (a FindingsIndex built from df) or indexing the column on the fly;
+    for those columns only matched cells count as PII values.
+
+    Method "redact_text" is meant for free-text columns: every PII span of every
+    type inside each cell is replaced by a format-preserving mask
+    (modules.text_redactor); only cells containing a span count as PII values,
+    and a cell counts as anonymized only if the output no longer contains one.
+
     Returns:
         anonymized_df, anon_report
         anon_report = {
             "total_pii_values": int,
             "anonymized_count": int,
             "anonymization_rate": float,
-            "verification_passed": bool
+            "verification_passed": bool,
+            "hash_cache_hits": int,     # digests of this call served from the in-process cache
+            "hash_cache_misses": int,   # digests of this call computed
+            "spans_by_type": {label: int}  # spans rewritten by "spans"/"redact_text"
         }
     """
     if method_config is None:
         method_config = {}
+    tally = {"lookups": 0, "misses": 0}
+    tally_token = _digest_tally.set(tally)
+    try:
+        return _anonymize_dataset(df, detections, method_config, persist_map, map_store, findings, inplace, tally)
+    finally:
+        _digest_tally.reset(tally_token)
+
 
-    df_out = df.copy()
+def _anonymize_dataset(df, detections, method_config, persist_map, map_store, findings, inplace, tally):
+    df_out = df if inplace else df.copy()
     total_pii_values = 0
     anonymized_count = 0
+    spans_by_type = {}
 
     # Group detections by column
     col_map = {}
@@ -194,46 +438,86 @@ def anonymize_dataset(df: pd.DataFrame, detections: List[Dict[str, Any]], method
                 method = "redact"
 
         series = df_out[col]
-        original_values = series.copy()
 
-        # Count PII before
-        pii_values_here = original_values[original_values.notna() & (original_values.astype(str) != "nan")].shape[0]
-        total_pii_values += pii_values_here
+        if method == "spans":
+            index = findings if findings is not None else build_findings_index(df_out, columns=[col])
+            matched_cells = len(index.rows(col))
+            df_out, span_report = anonymize_spans(df_out, index, columns=[col], inplace=True)
+            total_pii_values += matched_cells
+            anonymized_count += span_report["cells_rewritten"]
+            for label, n in span_report["spans_by_type"].items():
+                spans_by_type[label] = spans_by_type.get(label, 0) + n
+            continue
+
+        if method == "redact_text":
+            counts = {}
+            df_out[col], spans = redact_text_series(series, counts=counts)
+            # Verified by re-scanning the output: a cell that still holds a span was not anonymized
+            leaked = len(build_findings_index(df_out, columns=[col], items=redaction_patterns()).rows(col))
+            total_pii_values += counts.get("pii", 0)
+            anonymized_count += counts.get("pii", 0) - leaked
+            for label, n in spans.items():
+                spans_by_type[label] = spans_by_type.get(label, 0) + n
+            continue
 
-        # Apply anonymization
+        # PII values and changes are counted by the transformation as it runs
+        counts = {}
         if method == "mask":
             if chosen_pattern == "email":
-                df_out[col] = mask_email_series(series, keep_domain=True, keep_local_chars=1)
+                df_out[col] = mask_email_series(series, keep_domain=True, keep_local_chars=1, counts=counts)
             elif chosen_pattern == "phone":
-                df_out[col] = mask_phone_series(series, keep_last=3)
+                df_out[col] = mask_phone_series(series, keep_last=3, counts=counts)
             else:
-                df_out[col] = mask_value_series(series, keep_last=0)
+                df_out[col] = mask_value_series(series, keep_last=0, counts=counts)
         elif method == "hash":
-            df_out[col] = hash_value_series(series, length=12)
+            df_out[col] = hash_value_series(series, length=12, counts=counts)
         elif method == "redact":
-            df_out[col] = redact_series(series, token="REDACTED")
+            df_out[col] = redact_series(series, token="REDACTED", counts=counts)
         elif method == "fake":
             if chosen_pattern == "email":
-                df_out[col] = fake_email_series(series)
+                df_out[col] = fake_email_series(series, counts=counts)
             elif chosen_pattern == "phone":
-                df_out[col] = fake_phone_series(series)
+                df_out[col] = fake_phone_series(series, counts=counts)
             else:
-                df_out[col] = pseudonymize_series(series, prefix="FAKE", persist_map=persist_map)
+                df_out[col] = pseudonymize_series(series, prefix="FAKE", persist_map=persist_map, store=map_store,
+                                                  counts=counts)
         elif method in ("pseudonymize", "pseudo"):
-            df_out[col] = pseudonymize_series(series, prefix="USER", persist_map=persist_map)
+            df_out[col] = pseudonymize_series(series, prefix="USER", persist_map=persist_map, store=map_store,
+                                              counts=counts)
         else:
-            df_out[col] = redact_series(series, token="REDACTED")
+            df_out[col] = redact_series(series, token="REDACTED", counts=counts)
 
-        # Count anonymized changes
-        changed_count = (df_out[col] != original_values).sum()
-        anonymized_count += changed_count
+        total_pii_values += counts.get("pii", 0)
+        anonymized_count += counts.get("changed", 0)
 
     # Prepare report
     anon_report = {
         "total_pii_values": total_pii_values,
         "anonymized_count": anonymized_count,
         "anonymization_rate": (anonymized_count / total_pii_values * 100) if total_pii_values else 0,
-        "verification_passed": anonymized_count == total_pii_values
+        "verification_passed": anonymized_count == total_pii_values,
+        "hash_cache_hits": tally["lookups"] - tally["misses"],
+        "hash_cache_misses": tally["misses"],
+        "spans_by_type": spans_by_type
     }
 
     return df_out, anon_report
+
+
+def merge_anon_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine anon_report dicts from several chunks into one report for the whole dataset."""
+    total_pii_values = sum(int(r.get("total_pii_values", 0)) for r in reports)
+    anonymized_count = sum(int(r.get("anonymized_count", 0)) for r in reports)
+    spans_by_type = {}
+    for r in reports:
+        for label, n in r.get("spans_by_type", {}).items():
+            spans_by_type[label] = spans_by_type.get(label, 0) + n
+    return {
+        "total_pii_values": total_pii_values,
+        "anonymized_count": anonymized_count,
+        "anonymization_rate": (anonymized_count / total_pii_values * 100) if total_pii_values else 0,
+        "verification_passed": anonymized_count == total_pii_values,
+        "hash_cache_hits": sum(int(r.get("hash_cache_hits", 0)) for r in reports),
+        "hash_cache_misses": sum(int(r.get("hash_cache_misses", 0)) for r in reports),
+        "spans_by_type": spans_by_type
+    }
@@ -1,32 +1,219 @@
 # modules/compliance_scoring.py
 
-def score_compliance(detected_pii, config_rules):
-    total_rules = 3
-    passed_rules = 0
-    violations = []
-
-    # Rule 1: Max number of allowed PII types
-    max_allowed_pii = config_rules.get("max_pii_fields", 3)
-    pii_types_detected = set(item["pattern"] for item in detected_pii)
-    if len(pii_types_detected) <= max_allowed_pii:
-        passed_rules += 1
-    else:
-        violations.append(f"Too many PII types detected: {len(pii_types_detected)} > allowed {max_allowed_pii}")
+"""
+Compliance rule engine.
 
-    # Rule 2: Only allow specific PII types
-    allowed_types = config_rules.get("allowed_pii_types", [])
-    disallowed = [pii for pii in pii_types_detected if pii not in allowed_types]
-    if not disallowed:
-        passed_rules += 1
-    else:
-        for pii in disallowed:
-            violations.append(f"Disallowed PII type detected: {pii}")
+A rules config (config/rules.json) is compiled once into a tuple of predicate
+objects; compiled rule sets are cached by a hash of the config, so scoring the
+same policy again (e.g. re-scoring history) only pays for evaluation. The
+detection results are aggregated in a single pass into ScanFacts, and every
+predicate is then checked against those facts.
+
+Supported config keys:
+    max_pii_fields          int, most distinct PII types allowed (default 3)
+    allowed_pii_types       list, PII types allowed anywhere
+    anonymization_required  bool, the anon_report must pass verification
+    min_anonymization_rate  float, lowest acceptable anonymization rate in percent
+    max_total_matches       int, most matches allowed across all columns
+    type_thresholds         {pii_type: max matches across all columns}
+    column_rules            {column: {"allowed_pii_types": [...], "max_matches": int}}
+
+The score is the percentage of predicates that pass; the first three keys always
+compile to one predicate each, the others only when present.
+Further rules can be added with register_rule.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+# Compiled rule sets kept in memory
+RULE_CACHE_SIZE = 64
+
+
+class ScanFacts:
+    """Detection results aggregated once: types in order of appearance, totals per type and column."""
+
+    __slots__ = ("types", "type_matches", "column_types", "column_matches", "total_matches")
+
+    def __init__(self, detected_pii):
+        self.type_matches = {}
+        self.column_types = {}
+        self.column_matches = {}
+        self.total_matches = 0
+        for item in detected_pii:
+            pattern = item["pattern"]
+            column = str(item.get("column"))
+            matches = item.get("matches_found", 0)
+            self.type_matches[pattern] = self.type_matches.get(pattern, 0) + matches
+            self.column_types.setdefault(column, []).append(pattern)
+            self.column_matches[column] = self.column_matches.get(column, 0) + matches
+            self.total_matches += matches
+        self.types = list(self.type_matches)
+
+
+class Rule:
+    """A compiled predicate; check returns its violations (empty when it passes)."""
+
+    def check(self, facts: ScanFacts, anon_report: Dict[str, Any] = None) -> List[str]:
+        raise NotImplementedError
+
+
+class MaxPiiTypes(Rule):
+    def __init__(self, limit):
+        self.limit = limit
+
+    def check(self, facts, anon_report=None):
+        if len(facts.types) <= self.limit:
+            return []
+        return [f"Too many PII types detected: {len(facts.types)} > allowed {self.limit}"]
+
+
+class AllowedPiiTypes(Rule):
+    def __init__(self, allowed):
+        self.allowed = frozenset(allowed)
+
+    def check(self, facts, anon_report=None):
+        return [f"Disallowed PII type detected: {pii}" for pii in facts.types if pii not in self.allowed]
+
+
+class AnonymizationRequired(Rule):
+    """Passes when not required; otherwise the anon_report must be present and verified."""
+
+    def __init__(self, required, min_rate=None):
+        self.required = required
+        self.min_rate = min_rate
+
+    def check(self, facts, anon_report=None):
+        if not self.required:
+            return []
+        if not isinstance(anon_report, dict):
+            return ["Anonymization not verified."]
+        violations = []
+        if not anon_report.get("verification_passed", False):
+            violations.append(
+                f"Anonymization incomplete: {anon_report.get('anonymized_count', 0)} of "
+                f"{anon_report.get('total_pii_values', 0)} PII values anonymized")
+        rate = float(anon_report.get("anonymization_rate", 0.0))
+        if self.min_rate is not None and rate < self.min_rate:
+            violations.append(f"Anonymization rate {rate:.2f}% below required {self.min_rate}%")
+        return violations
+
+
+class MaxTotalMatches(Rule):
+    def __init__(self, limit):
+        self.limit = limit
 
-    # Rule 3: Anonymization required
-    if config_rules.get("anonymization_required", False):
-        violations.append("Anonymization not verified.")  # Future version can validate this
+    def check(self, facts, anon_report=None):
+        if facts.total_matches <= self.limit:
+            return []
+        return [f"Too many PII values detected: {facts.total_matches} > allowed {self.limit}"]
+
+
+class TypeThresholds(Rule):
+    def __init__(self, thresholds):
+        self.thresholds = dict(thresholds)
+
+    def check(self, facts, anon_report=None):
+        return [f"Too many {pii} values detected: {facts.type_matches[pii]} > allowed {limit}"
+                for pii, limit in self.thresholds.items()
+                if facts.type_matches.get(pii, 0) > limit]
+
+
+class ColumnRule(Rule):
+    def __init__(self, column, allowed=None, max_matches=None):
+        self.column = str(column)
+        self.allowed = frozenset(allowed) if allowed is not None else None
+        self.max_matches = max_matches
+
+    def check(self, facts, anon_report=None):
+        violations = []
+        if self.allowed is not None:
+            violations += [f"Disallowed PII type in column {self.column}: {pii}"
+                           for pii in facts.column_types.get(self.column, []) if pii not in self.allowed]
+        matches = facts.column_matches.get(self.column, 0)
+        if self.max_matches is not None and matches > self.max_matches:
+            violations.append(f"Too many PII values in column {self.column}: {matches} > allowed {self.max_matches}")
+        return violations
+
+
+# ---------- Compilation ----------
+def _core_rules(config):
+    return [
+        MaxPiiTypes(config.get("max_pii_fields", 3)),
+        AllowedPiiTypes(config.get("allowed_pii_types", [])),
+        AnonymizationRequired(config.get("anonymization_required", False), config.get("min_anonymization_rate")),
+    ]
+
+
+def _threshold_rules(config):
+    rules = []
+    if config.get("max_total_matches") is not None:
+        rules.append(MaxTotalMatches(config["max_total_matches"]))
+    if config.get("type_thresholds"):
+        rules.append(TypeThresholds(config["type_thresholds"]))
+    return rules
+
+
+def _column_rules(config):
+    return [ColumnRule(column, spec.get("allowed_pii_types"), spec.get("max_matches"))
+            for column, spec in (config.get("column_rules") or {}).items()]
+
+
+# Builders turn a config into predicates, in this order
+_RULE_BUILDERS: List[Callable[[Dict[str, Any]], List[Rule]]] = [_core_rules, _threshold_rules, _column_rules]
+
+_compiled: "OrderedDict[str, CompiledRules]" = OrderedDict()
+
+
+def register_rule(builder: Callable[[Dict[str, Any]], List[Rule]]):
+    """Add a builder (config -> list of Rule) to every rule set compiled from now on."""
+    _RULE_BUILDERS.append(builder)
+    _compiled.clear()
+    return builder
+
+
+class CompiledRules:
+    def __init__(self, rules: Tuple[Rule, ...]):
+        self.rules = rules
+
+    def score(self, detected_pii, anon_report=None) -> Tuple[float, List[str]]:
+        facts = ScanFacts(detected_pii)
+        passed = 0
+        violations = []
+        for rule in self.rules:
+            failed = rule.check(facts, anon_report)
+            if failed:
+                violations.extend(failed)
+            else:
+                passed += 1
+        score = round((passed / len(self.rules)) * 100, 2) if self.rules else 100.0
+        return score, violations
+
+
+def config_hash(config_rules: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(config_rules, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def compile_rules(config_rules: Dict[str, Any]) -> CompiledRules:
+    """Compile a rules config into predicates; cached by the config's hash."""
+    key = config_hash(config_rules)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = CompiledRules(tuple(r for build in _RULE_BUILDERS for r in build(config_rules)))
+        _compiled[key] = compiled
+        if len(_compiled) > RULE_CACHE_SIZE:
+            _compiled.popitem(last=False)
     else:
-        passed_rules += 1
+        _compiled.move_to_end(key)
+    return compiled
+
 
-    score = round((passed_rules / total_rules) * 100, 2)
-    return score, violations
+def score_compliance(detected_pii, config_rules, anon_report=None):
+    """
+    Returns (score, violations) for detection results under config_rules.
+    anon_report (from anonymize_dataset) lets anonymization_required pass once
+    anonymization is verified; without it that rule fails as before.
+    """
+    return compile_rules(config_rules).score(detected_pii, anon_report)
@@ -1,11 +1,19 @@
 # modules/db_loader.py
 
+import os
 import sqlite3
+import threading
+from urllib.parse import quote
 import pandas as pd
 
+DEFAULT_CHUNKSIZE = 50000
+
+# Memory-map up to this many bytes of each database file for reads
+MMAP_SIZE = 256 * 1024 * 1024
+
 def load_sqlite_table(db_path, table_name):
     conn = sqlite3.connect(db_path)
-    query = f"SELECT * FROM {table_name}"
+    query = f"SELECT * FROM {_quote(table_name)}"
     df = pd.read_sql_query(query, conn)
     conn.close()
     return df
@@ -17,3 +25,121 @@ def list_tables(db_path):
     tables = [row[0] for row in cursor.fetchall()]
     conn.close()
     return tables
+
+def _quote(name):
+    """Quote an SQL identifier (table or column name)."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+# ---------- Pooled read-only connections ----------
+# sqlite3 connections must stay on the thread that opened them, so the pool is per thread
+_pool = threading.local()
+
+def get_read_connection(db_path, immutable=False):
+    """
+    Return this thread's read-only connection to db_path, opening it on first use.
+
+    immutable=True tells SQLite the file cannot change while it is open, which
+    skips all locking; only use it on snapshots nobody is writing to.
+    """
+    connections = getattr(_pool, "connections", None)
+    # A forked worker must not reuse connections inherited from its parent
+    if connections is None or _pool.pid != os.getpid():
+        connections = _pool.connections = {}
+        _pool.pid = os.getpid()
+    key = (os.path.abspath(db_path), immutable)
+    conn = connections.get(key)
+    if conn is None:
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        uri = f"file:{quote(key[0])}?mode=ro" + ("&immutable=1" if immutable else "")
+        conn = sqlite3.connect(uri, uri=True)
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute("PRAGMA query_only=1")
+        connections[key] = conn
+    return conn
+
+def close_read_connections():
+    """Close every pooled connection opened by the calling thread."""
+    connections = getattr(_pool, "connections", {})
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+
+# ---------- Streaming table scans ----------
+def estimate_row_count(db_path, table_name, immutable=False):
+    """
+    Cheap row-count estimate for scheduling: sqlite_stat1 when ANALYZE has run,
+    else MAX(rowid) (an index seek), else COUNT(*) for WITHOUT ROWID tables.
+    """
+    conn = get_read_connection(db_path, immutable)
+    try:
+        row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? AND idx IS NULL", (table_name,)).fetchone()
+        if row is None:
+            row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ?", (table_name,)).fetchone()
+        if row is not None:
+            return int(str(row[0]).split()[0])
+    except sqlite3.OperationalError:
+        pass  # no sqlite_stat1 table
+    try:
+        return int(conn.execute(f"SELECT MAX(rowid) FROM {_quote(table_name)}").fetchone()[0] or 0)
+    except sqlite3.OperationalError:
+        return int(conn.execute(f"SELECT COUNT(*) FROM {_quote(table_name)}").fetchone()[0])
+
+def _is_text_type(declared):
+    # SQLite type affinity: CHAR/CLOB/TEXT are text; untyped (BLOB affinity) columns may hold anything
+    declared = (declared or "").upper()
+    return declared == "" or any(t in declared for t in ("CHAR", "CLOB", "TEXT"))
+
+def table_columns(db_path, table_name, text_only=False, immutable=False):
+    """Column names of a table, optionally only those that can hold text."""
+    conn = get_read_connection(db_path, immutable)
+    info = conn.execute(f"PRAGMA table_info({_quote(table_name)})").fetchall()
+    return [row[1] for row in info if not text_only or _is_text_type(row[2])]
+
+def _has_rowid(conn, table_name):
+    try:
+        conn.execute(f"SELECT rowid FROM {_quote(table_name)} LIMIT 0")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def iter_sqlite_table(db_path, table_name, columns=None, chunksize=DEFAULT_CHUNKSIZE, text_only=True,
+                      immutable=False):
+    """
+    Yield the table as DataFrames of at most chunksize rows.
+
+    Only columns (default: the text-like columns when text_only, else all) are
+    read. Rowid tables are paged by keyset (rowid > last seen), so each page is
+    an index seek and no read transaction is held between pages; WITHOUT ROWID
+    tables are streamed from a single cursor.
+    """
+    conn = get_read_connection(db_path, immutable)
+    if columns is None:
+        columns = table_columns(db_path, table_name, text_only=text_only, immutable=immutable)
+    if not columns:
+        return
+    select = ", ".join(_quote(c) for c in columns)
+    table = _quote(table_name)
+
+    if _has_rowid(conn, table_name):
+        last = None
+        while True:
+            if last is None:
+                rows = conn.execute(f"SELECT rowid, {select} FROM {table} ORDER BY rowid LIMIT ?",
+                                    (chunksize,)).fetchall()
+            else:
+                rows = conn.execute(f"SELECT rowid, {select} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                    (last, chunksize)).fetchall()
+            if not rows:
+                break
+            last = rows[-1][0]
+            yield pd.DataFrame.from_records([r[1:] for r in rows], columns=columns)
+            if len(rows) < chunksize:
+                break
+    else:
+        cursor = conn.execute(f"SELECT {select} FROM {table}")
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
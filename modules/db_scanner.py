@@ -0,0 +1,76 @@
+# modules/db_scanner.py
+
+"""
+PII scanning of SQLite tables without materializing them:
+rows are paged out of the database in chunks (modules.db_loader.iter_sqlite_table)
+and each chunk goes straight into detection; only the merged counts are kept.
+scan_sqlite_database runs that for every table of a database on a worker pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Tuple, Iterator
+
+from modules.db_loader import iter_sqlite_table, list_tables, estimate_row_count, DEFAULT_CHUNKSIZE
+from modules.stream_scanner import scan_chunks
+from modules.compliance_scoring import score_compliance
+from modules.history_logger import log_scan_history
+
+
+def scan_sqlite_table(db_path: str, table_name: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                      text_only: bool = True, immutable: bool = False) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Returns:
+        results, rows_scanned
+        results has the same records as detect_sensitive_data on the (projected) table.
+    With text_only, numeric/date columns are not read at all.
+    """
+    chunks = iter_sqlite_table(db_path, table_name, chunksize=chunksize, text_only=text_only,
+                               immutable=immutable)
+    return scan_chunks(chunks)
+
+
+# ---------- Whole-database scans ----------
+def _scan_table_job(args):
+    """Worker entry point; each worker process keeps its own pooled read-only connection."""
+    db_path, table_name, chunksize, text_only, immutable = args
+    results, rows = scan_sqlite_table(db_path, table_name, chunksize=chunksize, text_only=text_only,
+                                      immutable=immutable)
+    return table_name, results, rows
+
+
+def scan_sqlite_database(db_path: str, rules: Dict[str, Any], workers: int = None,
+                         chunksize: int = DEFAULT_CHUNKSIZE, text_only: bool = True, immutable: bool = False,
+                         tables: List[str] = None, log_history: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Scan every table of a SQLite database and yield one record per table as it finishes:
+        {"table", "rows", "results", "score", "violations"}
+
+    Tables are submitted largest first (by estimate_row_count) to a pool of
+    worker processes so the long tables start early. Each finished table is
+    scored with score_compliance and, with log_history, logged to the scan
+    history as "<db file>:<table>" by this (single writer) process.
+    """
+    if tables is None:
+        tables = list_tables(db_path)
+    sizes = {t: estimate_row_count(db_path, t, immutable) for t in tables}
+    ordered = sorted(tables, key=lambda t: sizes[t], reverse=True)
+    jobs = [(db_path, t, chunksize, text_only, immutable) for t in ordered]
+    db_name = os.path.basename(db_path)
+
+    def finish(table_name, results, rows):
+        score, violations = score_compliance(results, rules)
+        if log_history:
+            log_scan_history(results, score, violations, f"{db_name}:{table_name}")
+        return {"table": table_name, "rows": rows, "results": results, "score": score,
+                "violations": violations}
+
+    if not workers or workers <= 1:
+        for job in jobs:
+            yield finish(*_scan_table_job(job))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_scan_table_job, job) for job in jobs]
+        for future in as_completed(futures):
+            yield finish(*future.result())
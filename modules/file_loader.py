@@ -1,11 +1,229 @@
 # modules/file_loader.py
 
-import pandas as pd
+# pandas is imported where it is used, so the CLI and the lite CSV path start without it
+import csv
+import re
+
+DEFAULT_CHUNKSIZE = 50000
+
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_IPC_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+# Formats load_arrow_table memory-maps (scanned as Arrow tables when no DataFrame is needed)
+MEMORY_MAPPED_EXTENSIONS = PARQUET_EXTENSIONS + ARROW_IPC_EXTENSIONS
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx') + PARQUET_EXTENSIONS + ARROW_IPC_EXTENSIONS + JSONL_EXTENSIONS
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet/Feather/Arrow input requires pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+def load_arrow_table(file_path, columns=None):
+    """
+    Read a Parquet, Feather/Arrow IPC or JSON Lines file as a pyarrow.Table.
+
+    Parquet and IPC files are memory-mapped: IPC buffers point straight into the
+    mapping and nothing is converted to Python objects. Only the given columns
+    are read (pass text_columns(...) to scan string columns only).
+    """
+    _require_pyarrow()
+    if file_path.endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+        # ParquetFile rather than pq.read_table, whose dataset layer imports pandas
+        return pq.ParquetFile(file_path, memory_map=True).read(columns=columns)
+    elif file_path.endswith(ARROW_IPC_EXTENSIONS):
+        import pyarrow.feather as feather
+        return feather.read_table(file_path, columns=columns, memory_map=True)
+    elif file_path.endswith(JSONL_EXTENSIONS):
+        import pyarrow.json as pa_json
+        table = pa_json.read_json(file_path)
+        return table.select(columns) if columns is not None else table
+    else:
+        raise ValueError(f"Unsupported file format: {file_path}")
+
+def read_schema(file_path):
+    """Schema of a Parquet or Arrow IPC file, read from its footer without loading any data."""
+    pa = _require_pyarrow()
+    if file_path.endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+        return pq.read_schema(file_path, memory_map=True)
+    elif file_path.endswith(ARROW_IPC_EXTENSIONS):
+        with pa.memory_map(file_path) as source:
+            return pa.ipc.open_file(source).schema
+    return load_arrow_table(file_path).schema
+
+def text_columns(schema):
+    """Names of the string columns of an Arrow schema (plain, large or dictionary-encoded)."""
+    pa = _require_pyarrow()
+    names = []
+    for field in schema:
+        t = field.type
+        if pa.types.is_dictionary(t):
+            t = t.value_type
+        if pa.types.is_string(t) or pa.types.is_large_string(t):
+            names.append(field.name)
+    return names
+
+def load_data(file_path, columns=None):
+    """Load a file into a DataFrame; columns restricts which columns are read."""
+    import pandas as pd
+
+    if file_path.endswith('.csv'):
+        return pd.read_csv(file_path, usecols=columns)
+    elif file_path.endswith('.xlsx'):
+        return pd.read_excel(file_path, usecols=columns)
+    elif file_path.endswith(PARQUET_EXTENSIONS + ARROW_IPC_EXTENSIONS):
+        return load_arrow_table(file_path, columns=columns).to_pandas()
+    elif file_path.endswith(JSONL_EXTENSIONS):
+        df = pd.read_json(file_path, lines=True)
+        return df[columns] if columns is not None else df
+    else:
+        raise ValueError(f"Unsupported file format: {file_path}")
+
+def _iter_excel(file_path, chunksize):
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    # read_only mode streams rows from the sheet XML instead of building the workbook
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+def iter_data(file_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield the file as DataFrames of at most chunksize rows, without loading it whole.
+    CSV cells are read as text (missing values still become NaN): pandas infers
+    dtypes per chunk, so a chunk holding only "+251..." values would otherwise
+    become float and lose what the detector matches on.
+    """
+    import pandas as pd
 
-def load_data(file_path):
     if file_path.endswith('.csv'):
-        return pd.read_csv(file_path)
+        with pd.read_csv(file_path, chunksize=chunksize, dtype=str) as reader:
+            for chunk in reader:
+                yield chunk
     elif file_path.endswith('.xlsx'):
-        return pd.read_excel(file_path)
+        yield from _iter_excel(file_path, chunksize)
+    elif file_path.endswith(PARQUET_EXTENSIONS):
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(file_path, memory_map=True).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif file_path.endswith(ARROW_IPC_EXTENSIONS):
+        # IPC record batches already live in the mapping; slicing them is zero-copy
+        table = load_arrow_table(file_path)
+        for batch in table.to_batches(max_chunksize=chunksize):
+            yield batch.to_pandas()
+    elif file_path.endswith(JSONL_EXTENSIONS):
+        with pd.read_json(file_path, lines=True, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk
     else:
         raise ValueError(f"Unsupported file format: {file_path}")
+
+# ---------- Lite CSV reading (no pandas) ----------
+# pandas.read_csv's default missing-value markers
+CSV_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+_CSV_BOOLS = {'True': 'True', 'TRUE': 'True', 'true': 'True', 'False': 'False', 'FALSE': 'False', 'false': 'False'}
+_INT = re.compile(r'[+-]?\d+')
+_FLOAT = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+# Spellings of infinity pandas parses as float; unlike numbers, only when unpadded
+_INF = re.compile(r'[+-]?inf(?:inity)?', re.IGNORECASE)
+# Whitespace pandas ignores around a number (not Unicode spaces such as U+00A0)
+_CSV_SPACE = ' \t\n\r\x0b\x0c'
+
+def _float_exact(token):
+    """
+    True when float(token) and pandas' own float parser agree: at most 15 significant
+    digits scaled by at most 10**22 either way, where both are exact. Longer or
+    more extreme numbers can come out one ulp apart.
+    """
+    if _INF.fullmatch(token):
+        return True
+    mantissa, _, exponent = token.strip(_CSV_SPACE).lstrip('+-').lower().partition('e')
+    whole, _, fraction = mantissa.partition('.')
+    digits = (whole + fraction).lstrip('0')
+    scale = int(exponent or 0) - len(fraction) + len(digits) - len(digits.rstrip('0'))
+    digits = digits.rstrip('0')
+    return not digits or (len(digits) <= 15 and -22 <= scale <= 22)
+
+def _column_names(header):
+    """Header names as pandas reports them: blanks become 'Unnamed: i', duplicates get '.1', '.2', ..."""
+    names = []
+    seen = {}
+    for i, name in enumerate(header):
+        name = name or f"Unnamed: {i}"
+        base = name
+        while name in seen:
+            seen[base] += 1
+            name = f"{base}.{seen[base]}"
+        seen.setdefault(base, 0)
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+def _as_text(cells):
+    """
+    A column's cells rendered the way pd.read_csv(...)[col].astype(str) renders them:
+    the same int/float/bool inference (numbers may be padded with whitespace),
+    missing values as 'nan'. Raises ValueError where the pandas result cannot be
+    reproduced cheaply: integers outside int64 (uint64, float or text depending on
+    the rest of the column) and numbers that pandas' float parser rounds differently.
+    """
+    present = [c for c in cells if c not in CSV_NA_VALUES]
+    if not present:
+        return ['nan'] * len(cells)
+    if all(_INT.fullmatch(c.strip(_CSV_SPACE)) for c in present):
+        if not all(-2 ** 63 <= int(c) < 2 ** 63 for c in present):
+            raise ValueError("Integer column outside the int64 range")
+        if len(present) == len(cells):
+            return [str(int(c)) for c in cells]
+        render = lambda c: str(float(int(c)))
+    elif all(_FLOAT.fullmatch(c.strip(_CSV_SPACE)) or _INF.fullmatch(c) for c in present):
+        render = lambda c: str(float(c))
+    elif all(c in _CSV_BOOLS for c in present):
+        return ['nan' if c in CSV_NA_VALUES else _CSV_BOOLS[c] for c in cells]
+    else:
+        return ['nan' if c in CSV_NA_VALUES else c for c in cells]
+    if not all(_float_exact(c) for c in present):
+        raise ValueError("Numbers pandas' float parser may round differently")
+    return ['nan' if c in CSV_NA_VALUES else render(c) for c in cells]
+
+def read_csv_text(file_path):
+    """
+    Read a CSV with the csv module into (column names, one list of strings per column),
+    each cell as the pandas loader would render it. Meant for small files, where
+    importing pandas costs more than the scan. Raises ValueError for rows longer
+    than the header (pandas would treat the extra field as an index).
+    """
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        rows = [row for row in csv.reader(f) if row]
+    if not rows:
+        raise ValueError(f"No columns to parse from file: {file_path}")
+    names = _column_names(rows[0])
+    width = len(names)
+    columns = [[] for _ in range(width)]
+    for line, row in enumerate(rows[1:], start=2):
+        if len(row) > width:
+            raise ValueError(f"Expected {width} fields in line {line}, saw {len(row)}")
+        for i in range(width):
+            columns[i].append(row[i] if i < len(row) else '')
+    return names, [_as_text(cells) for cells in columns]
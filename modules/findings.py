@@ -0,0 +1,178 @@
+# modules/findings.py
+
+"""
+Row-level PII findings index.
+
+detect_sensitive_data only keeps a count per (column, pattern). The findings
+index keeps where every match is: for each column, parallel NumPy arrays of
+row positions, span start/end offsets and pattern ids. It is compact (14 bytes
+per finding), can be saved/loaded as .npz, paged through by reports, and used
+by anonymize_spans to rewrite only the matched spans of the matched cells.
+"""
+
+from typing import Callable, Dict, List, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.pii_detector import find_spans, patterns
+
+
+class FindingsIndex:
+    """Array-backed findings: per column rows (int64), starts/ends (int32), pattern ids (int16)."""
+
+    def __init__(self, labels: List[str], columns: Dict[Any, Dict[str, np.ndarray]] = None):
+        self.labels = list(labels)
+        self.columns = columns if columns is not None else {}
+
+    def __len__(self) -> int:
+        return sum(len(c["rows"]) for c in self.columns.values())
+
+    def count(self, column=None, pattern: str = None) -> int:
+        cols = [column] if column is not None else list(self.columns)
+        total = 0
+        for col in cols:
+            arrays = self.columns.get(col)
+            if arrays is None:
+                continue
+            if pattern is None:
+                total += len(arrays["rows"])
+            else:
+                total += int((arrays["pattern_ids"] == self.labels.index(pattern)).sum())
+        return total
+
+    def rows(self, column, pattern: str = None) -> np.ndarray:
+        """Sorted row positions of a column with at least one finding (of pattern, if given)."""
+        arrays = self.columns.get(column)
+        if arrays is None:
+            return np.empty(0, dtype=np.int64)
+        rows = arrays["rows"]
+        if pattern is not None:
+            rows = rows[arrays["pattern_ids"] == self.labels.index(pattern)]
+        return np.unique(rows)
+
+    def page(self, column=None, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Findings offset..offset+limit, ordered by column, row and start:
+        [{'column', 'row', 'start', 'end', 'pattern'}, ...]
+        """
+        out = []
+        cols = [column] if column is not None else list(self.columns)
+        for col in cols:
+            arrays = self.columns.get(col)
+            if arrays is None:
+                continue
+            n = len(arrays["rows"])
+            if offset >= n:
+                offset -= n
+                continue
+            stop = min(n, offset + limit - len(out))
+            for i in range(offset, stop):
+                out.append({
+                    "column": col,
+                    "row": int(arrays["rows"][i]),
+                    "start": int(arrays["starts"][i]),
+                    "end": int(arrays["ends"][i]),
+                    "pattern": self.labels[arrays["pattern_ids"][i]],
+                })
+            offset = 0
+            if len(out) >= limit:
+                break
+        return out
+
+    def save(self, path: str):
+        data = {"labels": np.array(self.labels, dtype=str), "column_names": np.array([str(c) for c in self.columns])}
+        for i, arrays in enumerate(self.columns.values()):
+            for key, arr in arrays.items():
+                data[f"{i}_{key}"] = arr
+        np.savez_compressed(path, **data)
+
+    @classmethod
+    def load(cls, path: str) -> "FindingsIndex":
+        with np.load(path) as data:
+            columns = {}
+            for i, name in enumerate(data["column_names"].tolist()):
+                columns[name] = {key: data[f"{i}_{key}"] for key in ("rows", "starts", "ends", "pattern_ids")}
+            return cls(data["labels"].tolist(), columns)
+
+
+def build_findings_index(df: pd.DataFrame, columns=None, items=None) -> FindingsIndex:
+    """
+    Scan df (or only columns) once and record every PII span.
+    Spans follow find_spans: non-overlapping, earlier patterns win overlaps.
+    Rows are positions (0..len(df)-1), not index labels.
+    items restricts the scan to these (label, regex) pairs (default: the patterns table).
+    """
+    if items is None:
+        items = tuple(patterns.items())
+    label_ids = {label: i for i, (label, _) in enumerate(items)}
+    index = FindingsIndex([label for label, _ in items])
+    for col in (columns if columns is not None else df.columns):
+        rows, starts, ends, ids = [], [], [], []
+        cache = {}
+        values = df[col].astype(str).tolist()
+        for row, value in enumerate(values):
+            if not isinstance(value, str):
+                continue
+            spans = cache.get(value)
+            if spans is None:
+                spans = cache[value] = find_spans(value, items)
+            for start, end, label in spans:
+                rows.append(row)
+                starts.append(start)
+                ends.append(end)
+                ids.append(label_ids[label])
+        if rows:
+            index.columns[col] = {
+                "rows": np.array(rows, dtype=np.int64),
+                "starts": np.array(starts, dtype=np.int32),
+                "ends": np.array(ends, dtype=np.int32),
+                "pattern_ids": np.array(ids, dtype=np.int16),
+            }
+    return index
+
+
+def _mask_span(label: str, text: str) -> str:
+    return "*" * len(text)
+
+
+def anonymize_spans(df: pd.DataFrame, index: FindingsIndex, columns=None,
+                    replace: Callable[[str, str], str] = _mask_span,
+                    inplace: bool = False) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Rewrite only the indexed spans of the indexed cells; every other cell and
+    every character outside a span is left untouched.
+    replace(label, span_text) returns the replacement (default: '*' per character).
+
+    Returns:
+        df_out, {"cells_rewritten": int, "spans_rewritten": int, "spans_by_type": {label: int}}
+    """
+    df_out = df if inplace else df.copy()
+    report = {"cells_rewritten": 0, "spans_rewritten": 0, "spans_by_type": {}}
+    for col in (columns if columns is not None else list(index.columns)):
+        arrays = index.columns.get(col)
+        if arrays is None or col not in df_out.columns:
+            continue
+        values = df_out[col].to_numpy(dtype=object, copy=True)
+        rows, starts, ends, ids = arrays["rows"], arrays["starts"], arrays["ends"], arrays["pattern_ids"]
+        # Findings are grouped by row; rebuild each matched cell once
+        boundaries = np.flatnonzero(np.diff(rows)) + 1
+        for group in np.split(np.arange(len(rows)), boundaries):
+            if len(group) == 0:
+                continue
+            row = rows[group[0]]
+            text = str(values[row])
+            parts = []
+            pos = 0
+            for i in group:
+                label = index.labels[ids[i]]
+                parts.append(text[pos:starts[i]])
+                parts.append(replace(label, text[starts[i]:ends[i]]))
+                pos = ends[i]
+                report["spans_by_type"][label] = report["spans_by_type"].get(label, 0) + 1
+            parts.append(text[pos:])
+            values[row] = "".join(parts)
+            report["cells_rewritten"] += 1
+            report["spans_rewritten"] += len(group)
+        df_out[col] = pd.Series(values, index=df_out.index, name=col)
+    return df_out, report
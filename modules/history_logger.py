@@ -1,16 +1,113 @@
 # modules/history_logger.py
 import os
-import pandas as pd
-from datetime import datetime
+import json
+import math
+import sqlite3
+from datetime import datetime, date
 
+HISTORY_DB = "output/scan_history.db"
+# Legacy CSV history; imported into the database the first time it is created
 HISTORY_FILE = "output/scan_history.csv"
 
+HISTORY_COLUMNS = [
+    "timestamp", "source", "compliance_score", "violations", "pii_types",
+    "total_pii_values", "anonymized_count", "anonymization_rate", "verification_passed"
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    source TEXT,
+    compliance_score REAL,
+    violations TEXT,
+    pii_types TEXT,
+    total_pii_values INTEGER,
+    anonymized_count INTEGER,
+    anonymization_rate REAL,
+    verification_passed INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_scans_timestamp ON scans (timestamp);
+CREATE INDEX IF NOT EXISTS idx_scans_source_timestamp ON scans (source, timestamp);
+CREATE TABLE IF NOT EXISTS scan_pii_types (
+    scan_id INTEGER NOT NULL REFERENCES scans (id),
+    pii_type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scan_pii_types ON scan_pii_types (pii_type, scan_id);
+CREATE TABLE IF NOT EXISTS scan_violations (
+    scan_id INTEGER NOT NULL REFERENCES scans (id),
+    violation TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scan_violations ON scan_violations (violation, scan_id);
+CREATE TABLE IF NOT EXISTS scan_metrics (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER REFERENCES scans (id),
+    timestamp TEXT NOT NULL,
+    source TEXT,
+    wall_seconds REAL,
+    peak_rss_mb REAL,
+    metrics TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scan_metrics_timestamp ON scan_metrics (timestamp);
+"""
+
+_initialized = set()
+
 def _ensure_output_dir():
-    os.makedirs("output", exist_ok=True)
+    os.makedirs(os.path.dirname(HISTORY_DB) or ".", exist_ok=True)
+
+def _connect():
+    """Open the history database; concurrent scans serialize on SQLite's write lock."""
+    _ensure_output_dir()
+    conn = sqlite3.connect(HISTORY_DB, timeout=30)
+    if HISTORY_DB not in _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Check, create and import in one write transaction: of several processes
+        # opening a new database at once, only the first imports the legacy CSV
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            is_new = conn.execute("SELECT name FROM sqlite_master WHERE name='scans'").fetchone() is None
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            if is_new:
+                _import_legacy_csv(conn)
+        _initialized.add(HISTORY_DB)
+    return conn
+
+def _split(value, sep):
+    """'a, b' / 'a; b' strings from the legacy CSV back into lists ('None' -> [])."""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or str(value) in ("", "None", "nan"):
+        return []
+    return str(value).split(sep)
+
+def _import_legacy_csv(conn):
+    """Copy the legacy CSV history into the database; runs in the caller's transaction."""
+    if not os.path.exists(HISTORY_FILE):
+        return
+    import pandas as pd
+    try:
+        legacy = pd.read_csv(HISTORY_FILE)
+    except Exception:
+        return
+    for row in legacy.to_dict("records"):
+        _insert(conn, row, _split(row.get("pii_types"), ", "), _split(row.get("violations"), "; "))
+
+def _insert(conn, entry, pii_types, violations):
+    cur = conn.execute(
+        f"INSERT INTO scans ({', '.join(HISTORY_COLUMNS)}) VALUES ({', '.join('?' * len(HISTORY_COLUMNS))})",
+        [entry.get(c) for c in HISTORY_COLUMNS]
+    )
+    scan_id = cur.lastrowid
+    conn.executemany("INSERT INTO scan_pii_types (scan_id, pii_type) VALUES (?, ?)",
+                     [(scan_id, str(p)) for p in pii_types])
+    conn.executemany("INSERT INTO scan_violations (scan_id, violation) VALUES (?, ?)",
+                     [(scan_id, str(v)) for v in violations])
+    return scan_id
 
 def log_scan_history(results, score, violations, source, anon_report=None):
     """
-    Append a scan record to output/scan_history.csv
+    Append a scan record to the history database (output/scan_history.db)
 
     Parameters:
       - results: list of detection dicts (each: {'column','pattern','matches_found'})
@@ -19,18 +116,21 @@ def log_scan_history(results, score, violations, source, anon_report=None):
       - source: string (uploaded filename or table name)
       - anon_report: dict from anonymize_dataset with keys:
             total_pii_values, anonymized_count, anonymization_rate, verification_passed
-    """
-    _ensure_output_dir()
 
+    Returns the id of the new scan record.
+    """
     # Normalize inputs
     if isinstance(violations, (list, tuple, set)):
-        violations_str = "; ".join([str(v) for v in violations]) if violations else "None"
+        violation_list = [str(v) for v in violations]
+    elif violations in (None, float("nan")):
+        violation_list = []
     else:
-        violations_str = str(violations) if violations not in (None, float("nan")) else "None"
+        violation_list = [str(violations)]
+    violations_str = "; ".join(violation_list) if violation_list else "None"
 
     # extract pii types
-    pii_types = sorted(set([r.get("pattern") for r in results])) if results else []
-    pii_types_str = ", ".join([str(p) for p in pii_types]) if pii_types else "None"
+    pii_types = sorted(set([str(r.get("pattern")) for r in results])) if results else []
+    pii_types_str = ", ".join(pii_types) if pii_types else "None"
 
     # anonymization stats
     total_pii_values = int(anon_report.get("total_pii_values", 0)) if isinstance(anon_report, dict) else 0
@@ -50,30 +150,114 @@ def log_scan_history(results, score, violations, source, anon_report=None):
         "verification_passed": verification_passed
     }
 
-    # Append or create CSV
-    if os.path.exists(HISTORY_FILE):
-        try:
-            df = pd.read_csv(HISTORY_FILE)
-        except Exception:
-            df = pd.DataFrame()
-        df = pd.concat([df, pd.DataFrame([new_entry])], ignore_index=True)
-    else:
-        df = pd.DataFrame([new_entry])
-
-    df.to_csv(HISTORY_FILE, index=False)
-
-def load_scan_history():
-    """Return dataframe of history; returns empty dataframe if none."""
-    if os.path.exists(HISTORY_FILE):
-        try:
-            return pd.read_csv(HISTORY_FILE)
-        except Exception:
-            return pd.DataFrame(columns=[
-                "timestamp","source","compliance_score","violations","pii_types",
-                "total_pii_values","anonymized_count","anonymization_rate","verification_passed"
-            ])
-    else:
-        return pd.DataFrame(columns=[
-            "timestamp","source","compliance_score","violations","pii_types",
-            "total_pii_values","anonymized_count","anonymization_rate","verification_passed"
-        ])
+    # Single-row append; the transaction keeps the scan and its type rows together
+    conn = _connect()
+    try:
+        with conn:
+            return _insert(conn, new_entry, pii_types, violation_list)
+    finally:
+        conn.close()
+
+def log_scan_metrics(record, scan_id=None):
+    """
+    Store a run metrics record (modules.metrics.RunMetrics.record) next to the
+    scan history; scan_id links it to the scans row of the same run, if any.
+    Returns the id of the new metrics row.
+    """
+    conn = _connect()
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO scan_metrics (scan_id, timestamp, source, wall_seconds, peak_rss_mb, metrics) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (scan_id, record.get("timestamp") or datetime.now().isoformat(timespec='seconds'),
+                 record.get("source"), record.get("wall_seconds"), record.get("peak_rss_mb"), json.dumps(record))
+            )
+            return cur.lastrowid
+    finally:
+        conn.close()
+
+# ---------- Queries (run inside SQLite; history is never loaded whole) ----------
+def _bound(value, end=False):
+    """ISO string for a date/datetime/str bound; a bare date as end covers the whole day."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='seconds')
+    if isinstance(value, date):
+        return f"{value.isoformat()}T23:59:59" if end else value.isoformat()
+    return str(value)
+
+def _where(start=None, end=None, source=None, alias="s"):
+    clauses, params = [], []
+    if start is not None:
+        clauses.append(f"{alias}.timestamp >= ?")
+        params.append(_bound(start))
+    if end is not None:
+        clauses.append(f"{alias}.timestamp <= ?")
+        params.append(_bound(end, end=True))
+    if source is not None:
+        clauses.append(f"{alias}.source = ?")
+        params.append(source)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def _query(sql, params):
+    import pandas as pd
+    conn = _connect()
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+def load_scan_history(start=None, end=None, source=None, limit=None):
+    """Return dataframe of history (optionally filtered); returns empty dataframe if none."""
+    where, params = _where(start, end, source)
+    sql = f"SELECT {', '.join('s.' + c for c in HISTORY_COLUMNS)} FROM scans s{where} ORDER BY s.timestamp, s.id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    df = _query(sql, params)
+    df["verification_passed"] = df["verification_passed"].astype(bool)
+    return df
+
+def list_sources():
+    """Distinct scan sources, alphabetically."""
+    return _query("SELECT DISTINCT source FROM scans ORDER BY source", [])["source"].tolist()
+
+def score_trend(start=None, end=None, source=None, period="day"):
+    """Average compliance score and anonymization rate per day (or 'month'/'hour')."""
+    width = {"hour": 13, "day": 10, "month": 7}[period]
+    where, params = _where(start, end, source)
+    return _query(
+        f"SELECT substr(s.timestamp, 1, {width}) AS period, COUNT(*) AS scans, "
+        f"AVG(s.compliance_score) AS avg_score, AVG(s.anonymization_rate) AS avg_anonymization_rate "
+        f"FROM scans s{where} GROUP BY period ORDER BY period",
+        params
+    )
+
+def pii_type_frequencies(start=None, end=None, source=None):
+    """Number of scans in which each PII type was detected, most frequent first."""
+    where, params = _where(start, end, source)
+    return _query(
+        f"SELECT t.pii_type, COUNT(*) AS scans FROM scan_pii_types t JOIN scans s ON s.id = t.scan_id"
+        f"{where} GROUP BY t.pii_type ORDER BY scans DESC, t.pii_type",
+        params
+    )
+
+def violation_frequencies(start=None, end=None, source=None):
+    """Number of scans reporting each violation, most frequent first."""
+    where, params = _where(start, end, source)
+    return _query(
+        f"SELECT v.violation, COUNT(*) AS scans FROM scan_violations v JOIN scans s ON s.id = v.scan_id"
+        f"{where} GROUP BY v.violation ORDER BY scans DESC, v.violation",
+        params
+    )
+
+def load_scan_metrics(start=None, end=None, source=None, limit=None):
+    """Stored metrics records (dicts, oldest first), optionally filtered like load_scan_history."""
+    where, params = _where(start, end, source, alias="m")
+    sql = f"SELECT m.metrics FROM scan_metrics m{where} ORDER BY m.timestamp, m.id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return [json.loads(m) for m in _query(sql, params)["metrics"]]
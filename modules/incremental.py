@@ -0,0 +1,158 @@
+# modules/incremental.py
+
+"""
+Incremental re-scans of CSV files.
+
+The file is cut into blocks of rows_per_chunk records at record boundaries
+(quoted newlines are respected). Each block is fingerprinted by its byte range
+and a BLAKE2 hash of its bytes, and its per-column match counts are cached next
+to the fingerprint. On the next run only blocks whose fingerprint changed (or
+that are new, e.g. appended rows) are parsed and scanned; every other block
+reuses its cached counts. Blocks are parsed as text (dtype=str), so the
+counts of a block do not depend on which rows share it.
+
+The cache is invalidated as a whole when the header, the block size, the
+detection patterns or the cache format change.
+"""
+
+import hashlib
+import io
+import json
+import os
+from typing import List, Dict, Any, Tuple
+
+import pandas as pd
+
+from modules.pii_detector import detect_sensitive_data, merge_detection_results, patterns
+
+FINGERPRINT_DIR = "output/fingerprints"
+DEFAULT_ROWS_PER_CHUNK = 50000
+# Bumped whenever cached counts would no longer match a fresh scan (2: blocks parsed as text)
+CACHE_VERSION = 2
+
+
+def _fingerprint(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _cache_path(path: str) -> str:
+    name = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(FINGERPRINT_DIR, f"{name}.json")
+
+
+def _patterns_hash() -> str:
+    return _fingerprint(json.dumps(list(patterns.items())).encode("utf-8"))
+
+
+def _read_record(f) -> bytes:
+    """Read one CSV record; a record continues over newlines while a quote is open."""
+    record = b""
+    quotes = 0
+    while True:
+        line = f.readline()
+        if not line:
+            return record
+        record += line
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            return record
+
+
+def iter_record_blocks(path: str, rows_per_chunk: int = DEFAULT_ROWS_PER_CHUNK):
+    """Yield (header, start_offset, end_offset, rows, block_bytes) for consecutive blocks of records."""
+    with open(path, "rb") as f:
+        header = _read_record(f)
+        while True:
+            start = f.tell()
+            records = []
+            for _ in range(rows_per_chunk):
+                record = _read_record(f)
+                if not record:
+                    break
+                records.append(record)
+            if not records:
+                return
+            yield header, start, f.tell(), len(records), b"".join(records)
+
+
+def _load_cache(path: str) -> Dict[str, Any]:
+    cache_file = _cache_path(path)
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+
+def _save_cache(path: str, cache: Dict[str, Any]):
+    os.makedirs(FINGERPRINT_DIR, exist_ok=True)
+    tmp = _cache_path(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp, _cache_path(path))
+
+
+def _to_results(counts: Dict[str, Dict[str, int]]) -> List[Dict[str, Any]]:
+    return [{"column": col, "pattern": label, "matches_found": n}
+            for col, labels in counts.items() for label, n in labels.items()]
+
+
+def _to_counts(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    counts = {}
+    for r in results:
+        counts.setdefault(str(r["column"]), {})[r["pattern"]] = r["matches_found"]
+    return counts
+
+
+def scan_incremental(path: str, rows_per_chunk: int = DEFAULT_ROWS_PER_CHUNK) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Returns:
+        results, stats
+        results has the same records as detect_sensitive_data on the file read
+        as text (pd.read_csv(path, dtype=str)), wherever the block boundaries fall;
+        stats = {"chunks": int, "reused": int, "rescanned": int, "rows": int}
+    """
+    if not path.endswith(".csv"):
+        raise ValueError(f"Incremental scans support CSV files only: {path}")
+
+    cache = _load_cache(path)
+    valid = (cache.get("version") == CACHE_VERSION and cache.get("rows_per_chunk") == rows_per_chunk
+             and cache.get("patterns") == _patterns_hash())
+    cached_chunks = cache.get("chunks", []) if valid else []
+
+    chunks = []
+    partials = []
+    stats = {"chunks": 0, "reused": 0, "rescanned": 0, "rows": 0}
+    header_hash = None
+    columns = None
+    for i, (header, start, end, rows, block) in enumerate(iter_record_blocks(path, rows_per_chunk)):
+        if header_hash is None:
+            header_hash = _fingerprint(header)
+            columns = [str(c) for c in pd.read_csv(io.BytesIO(header), nrows=0).columns]
+            if cache.get("header") != header_hash:
+                cached_chunks = []
+        fingerprint = _fingerprint(block)
+        old = cached_chunks[i] if i < len(cached_chunks) else None
+        if old and old["start"] == start and old["end"] == end and old["hash"] == fingerprint:
+            counts = old["counts"]
+            stats["reused"] += 1
+        else:
+            df = pd.read_csv(io.BytesIO(header + block), dtype=str)
+            counts = _to_counts(detect_sensitive_data(df))
+            stats["rescanned"] += 1
+        chunks.append({"start": start, "end": end, "rows": rows, "hash": fingerprint, "counts": counts})
+        partials.append(_to_results(counts))
+        stats["chunks"] += 1
+        stats["rows"] += rows
+
+    _save_cache(path, {
+        "version": CACHE_VERSION,
+        "path": os.path.abspath(path),
+        "header": header_hash,
+        "rows_per_chunk": rows_per_chunk,
+        "patterns": _patterns_hash(),
+        "chunks": chunks,
+    })
+    return merge_detection_results(partials, columns), stats
@@ -0,0 +1,159 @@
+# modules/mapping_store.py
+
+"""
+Persistent storage for the deterministic pseudonym mapping (key -> pseudonym).
+
+Backends:
+- SqliteMappingStore (default): indexed table, batched lookups, inserts only
+  the new keys, safe for several concurrent writers (WAL + busy timeout)
+- JsonMappingStore (legacy): the original output/anonymization_map.json file,
+  fully loaded and rewritten on every change
+
+Use open_mapping_store() to get a process-wide shared store for a path.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable
+
+SQLITE_MAP_PATH = "output/anonymization_map.db"
+JSON_MAP_PATH = "output/anonymization_map.json"
+
+# SQLite's default limit on bound parameters per statement is 999
+_BATCH = 900
+
+
+class MappingStore:
+    """Interface every mapping backend implements."""
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Return the stored pseudonym for each of keys that is present."""
+        raise NotImplementedError
+
+    def put_many(self, mapping: Dict[str, str]) -> None:
+        """Store new key -> pseudonym pairs. Existing keys keep their value."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class JsonMappingStore(MappingStore):
+    """Legacy backend: one JSON object on disk, loaded whole and rewritten whole."""
+
+    def __init__(self, path: str = JSON_MAP_PATH):
+        self.path = path
+
+    def _load(self) -> Dict[str, str]:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception:
+                return {}
+        return {}
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        mapping = self._load()
+        return {k: mapping[k] for k in keys if k in mapping}
+
+    def put_many(self, mapping: Dict[str, str]) -> None:
+        if not mapping:
+            return
+        current = self._load()
+        for k, v in mapping.items():
+            current.setdefault(k, v)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+
+
+class SqliteMappingStore(MappingStore):
+    """Indexed on-disk mapping; only touched keys are read or written."""
+
+    def __init__(self, path: str = SQLITE_MAP_PATH, legacy_json: str = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mapping (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+        )
+        if legacy_json:
+            self._import_legacy(legacy_json)
+
+    def _import_legacy(self, json_path: str) -> None:
+        """Seed an empty store from the legacy JSON map, if one exists."""
+        if not os.path.exists(json_path):
+            return
+        with self._lock:
+            empty = self._conn.execute("SELECT 1 FROM mapping LIMIT 1").fetchone() is None
+        if empty:
+            self.put_many(JsonMappingStore(json_path)._load())
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _BATCH):
+                batch = keys[i:i + _BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM mapping WHERE key IN ({placeholders})", batch
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, mapping: Dict[str, str]) -> None:
+        if not mapping:
+            return
+        with self._lock:
+            # IMMEDIATE takes the write lock up front; other writers wait (busy timeout)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR IGNORE INTO mapping (key, value) VALUES (?, ?)",
+                                       mapping.items())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM mapping").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[tuple, MappingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_mapping_store(backend: str = "sqlite", path: str = None) -> MappingStore:
+    """
+    Return the shared store for (backend, path), opening it on first use.
+    A new SQLite store imports the legacy JSON map when one is present.
+    """
+    if backend not in ("sqlite", "json"):
+        raise ValueError(f"Unsupported mapping backend: {backend}")
+    if path is None:
+        path = SQLITE_MAP_PATH if backend == "sqlite" else JSON_MAP_PATH
+    with _stores_lock:
+        store = _stores.get((backend, path))
+        if store is None:
+            if backend == "sqlite":
+                store = SqliteMappingStore(path, legacy_json=JSON_MAP_PATH)
+            else:
+                store = JsonMappingStore(path)
+            _stores[(backend, path)] = store
+        return store
@@ -0,0 +1,156 @@
+# modules/metrics.py
+
+"""
+Run metrics for the scan pipeline.
+
+A run is wrapped in collect(); inside it, stage(name) blocks accumulate wall
+time per stage and count(name, n) accumulates counters (rows scanned, bytes
+read, cache hits, ...). The instrumented modules call stage()/count()
+unconditionally: with no run collecting they are no-ops.
+
+    with metrics.collect(source=path) as run:
+        with metrics.stage("load"):
+            df = load_data(path)
+        ...
+    record = run.record()   # JSON-serialisable dict, see RunMetrics.record
+
+pattern_timing=True additionally times every regex of the detector
+separately (slower; serial scans only, worker processes are not measured).
+profile_dir dumps a cProfile .prof file and the top tracemalloc allocation
+sites of the run there, to look into a slow run after the fact.
+"""
+
+import cProfile
+import contextvars
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# The collecting run of the current thread (or task); a run started in one
+# thread is not seen by stage()/count() calls made from other threads
+_active: "contextvars.ContextVar[Optional[RunMetrics]]" = contextvars.ContextVar("metrics_run", default=None)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1e6 if os.uname().sysname == "Darwin" else 1e3), 1)
+
+
+class RunMetrics:
+    """Stage timings, counters and per-pattern regex time of one pipeline run."""
+
+    def __init__(self, source: str = None, pattern_timing: bool = False):
+        self.source = source
+        self.pattern_timing = pattern_timing
+        self.started = datetime.now()
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.pattern_seconds: Dict[str, float] = {}
+        self._start = time.perf_counter()
+        self._end = None
+
+    def add_time(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def add_pattern_time(self, label: str, seconds: float):
+        self.pattern_seconds[label] = self.pattern_seconds.get(label, 0.0) + seconds
+
+    def record(self) -> Dict[str, Any]:
+        """
+        {
+            "timestamp", "source", "wall_seconds",
+            "stages": {stage: seconds}, "counters": {name: int},
+            "pattern_seconds": {label: seconds}, "peak_rss_mb": float | None
+        }
+        """
+        end = self._end if self._end is not None else time.perf_counter()
+        return {
+            "timestamp": self.started.isoformat(timespec='seconds'),
+            "source": self.source,
+            "wall_seconds": round(end - self._start, 6),
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+            "pattern_seconds": {k: round(v, 6) for k, v in self.pattern_seconds.items()},
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.record())
+
+
+def current():
+    """The RunMetrics collecting in this context, or None."""
+    return _active.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Add the wall time of the block to stage name of the active run (no-op without one)."""
+    run = _active.get()
+    if run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_time(name, time.perf_counter() - start)
+
+
+def count(name: str, n: int = 1):
+    run = _active.get()
+    if run is not None:
+        run.count(name, n)
+
+
+def _dump_profile(profile_dir, profiler, snapshot, started):
+    os.makedirs(profile_dir, exist_ok=True)
+    stem = os.path.join(profile_dir, f"run_{started.strftime('%Y%m%d_%H%M%S')}")
+    profiler.dump_stats(stem + ".prof")
+    with open(stem + "_memory.txt", "w", encoding="utf-8") as f:
+        for stat in snapshot.statistics("lineno")[:50]:
+            f.write(f"{stat}\n")
+    return stem
+
+
+@contextmanager
+def collect(source: str = None, pattern_timing: bool = False, profile_dir: str = None):
+    """
+    Collect metrics for the enclosed run; yields its RunMetrics.
+    With profile_dir, <profile_dir>/run_<timestamp>.prof (cProfile, open with
+    pstats or snakeviz) and run_<timestamp>_memory.txt (tracemalloc) are written.
+    """
+    run = RunMetrics(source, pattern_timing)
+    token = _active.set(run)
+    profiler = None
+    if profile_dir:
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield run
+    finally:
+        run._end = time.perf_counter()
+        _active.reset(token)
+        if profiler is not None:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            run.count("traced_peak_bytes", tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            _dump_profile(profile_dir, profiler, snapshot, run.started)
@@ -0,0 +1,92 @@
+# modules/ner_detector.py
+
+"""
+Optional spaCy named-entity backend for free-text columns.
+
+The regex detector cannot tell a person from any other pair of capitalised
+words, and knows nothing about organisations or places. This backend runs a
+spaCy NER model over the columns the regex pre-pass marks as free text
+(pii_detector.free_text_columns) and returns records in the same schema as
+detect_sensitive_data: {'column', 'pattern', 'matches_found'}, where
+matches_found is the number of cells with at least one entity of that type.
+
+Speed comes from three things: the model is loaded once per process and kept
+(load_model is cached), every component except NER is disabled, and cells are
+streamed through nlp.pipe in batches (optionally in n_process workers), each
+distinct text only once.
+
+spaCy is optional: pip install spacy && python -m spacy download en_core_web_sm
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from modules.pii_detector import free_text_columns
+
+DEFAULT_MODEL = "en_core_web_sm"
+DEFAULT_BATCH_SIZE = 256
+
+# spaCy entity label -> pattern name reported in the results
+ENTITY_PATTERNS = {
+    "PERSON": "person",
+    "ORG": "organization",
+    "GPE": "location",
+    "LOC": "location",
+}
+
+# Components NER needs; everything else in the pipeline is disabled
+_NER_COMPONENTS = ("tok2vec", "transformer", "ner")
+
+
+def _require_spacy():
+    try:
+        import spacy
+    except ImportError:
+        raise ImportError("NER detection requires spaCy: pip install spacy "
+                          "&& python -m spacy download en_core_web_sm") from None
+    return spacy
+
+
+@lru_cache(maxsize=4)
+def load_model(name: str = DEFAULT_MODEL):
+    """Load a spaCy model with only the NER path enabled; cached per process."""
+    spacy = _require_spacy()
+    nlp = spacy.load(name)
+    nlp.select_pipes(enable=[c for c in _NER_COMPONENTS if c in nlp.pipe_names])
+    return nlp
+
+
+def _count_entities(nlp, values, batch_size, n_process) -> Dict[str, int]:
+    """Count, per pattern, how many of the given strings contain at least one entity."""
+    seen = {}
+    for value in values:
+        if isinstance(value, str) and value.strip():
+            seen[value] = seen.get(value, 0) + 1
+    counts = {}
+    texts = list(seen)
+    for text, doc in zip(texts, nlp.pipe(texts, batch_size=batch_size, n_process=n_process)):
+        found = {ENTITY_PATTERNS[ent.label_] for ent in doc.ents if ent.label_ in ENTITY_PATTERNS}
+        for label in found:
+            counts[label] = counts.get(label, 0) + seen[text]
+    return counts
+
+
+def detect_entities(df, columns=None, model: str = DEFAULT_MODEL,
+                    batch_size: int = DEFAULT_BATCH_SIZE, n_process: int = 1) -> List[Dict[str, Any]]:
+    """
+    Return one {'column','pattern','matches_found'} record per column/entity type with matches.
+
+    columns defaults to free_text_columns(df); pass a list to override.
+    n_process > 1 lets spaCy fan batches out to worker processes.
+    """
+    nlp = load_model(model)
+    results = []
+    for col in (columns if columns is not None else free_text_columns(df)):
+        counts = _count_entities(nlp, df[col].tolist(), batch_size, n_process)
+        for label in sorted(counts, key=list(ENTITY_PATTERNS.values()).index):
+            results.append({
+                'column': col,
+                'pattern': label,
+                'matches_found': counts[label]
+            })
+    return results
@@ -0,0 +1,261 @@
+# modules/pattern_registry.py
+
+"""
+The PII pattern table and everything attached to it.
+
+- patterns: label -> regex, in priority order (pii_detector re-exports it).
+- VALIDATORS: label -> cheap secondary check run on each candidate match, so a
+  pattern can stay narrow and fast (a Credit Card must pass the Luhn check).
+- register_pattern / load_custom_patterns add patterns at runtime, e.g. from
+  "custom_patterns" in config/rules.json; each new regex is compiled on its own
+  and inside the combined alternation detection runs (combined_pattern), and
+  run against adversarial inputs, and rejected if any of that fails. A reload
+  (load_custom_patterns(..., replace=True)) also drops the custom patterns that
+  are no longer configured.
+- pattern_stats: per-pattern counters of matched cells, candidates rejected by
+  a validator and regex time (time is only measured while a metrics run with
+  pattern_timing is collecting, see modules.metrics).
+"""
+
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Define regex patterns for various PII types
+patterns = {
+    'email': r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+',
+    'phone': r'\+251[0-9]{9}',  # Ethiopian phone format
+    'national_id': r'[A-Z]{2}[0-9]{8}',
+    'SSN': r'\b\d{3}-\d{2}-\d{4}\b',  # Matches 123-45-6789
+    'Credit Card': r'\b\d(?:[ -]?\d){12,15}\b',  # 13-16 digits, single space/dash separators; Luhn-checked
+    'Name': r'\b[A-Z][a-z]+ [A-Z][a-z]+\b',  # Matches First Last
+}
+
+# How the detector compiles every pattern: case-insensitive like str.contains(case=False),
+# with ASCII \d, \w, \s and \b as in RE2, which runs the same patterns on Arrow columns.
+# RE2 still folds case by Unicode rules, so only it matches k/s against the Kelvin sign
+# (U+212A) and the long s (U+017F).
+REGEX_FLAGS = re.IGNORECASE | re.ASCII
+
+# Longest time a probe search may take before a regex counts as backtracking
+PROBE_BUDGET_SECONDS = 0.05
+# Adversarial input sizes: small steps first (exponential blow-up), then doubling (polynomial)
+_PROBE_LENGTHS = tuple(range(4, 33, 2)) + (64, 128, 256, 512, 1024, 2048, 4096)
+
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def luhn_valid(candidate: str) -> bool:
+    """Luhn checksum over the digits of candidate (separators ignored)."""
+    digits = [ord(ch) - 48 for ch in candidate if '0' <= ch <= '9']
+    if len(digits) < 13:
+        return False
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    'Credit Card': luhn_valid,
+}
+
+# The built-in table, restored for a label when a custom pattern overriding it is dropped
+_BUILTIN_PATTERNS = dict(patterns)
+_BUILTIN_VALIDATORS = dict(VALIDATORS)
+# Labels registered by load_custom_patterns; only these are dropped by a reload
+_custom_labels = set()
+# Serializes changes to patterns/VALIDATORS (readers snapshot the table, see load_custom_patterns)
+_table_lock = threading.Lock()
+
+
+# ---------- Backtracking probe ----------
+def _probe_inputs(regex: str, n: int):
+    """Strings of length ~n built from the characters the regex looks for, ending in a mismatch."""
+    literals = sorted({ch for ch in re.sub(r'\\.', '', regex) if ch.isprintable() and ch not in '()[]{}?*+|^$\\'})
+    alphabets = ["1", "a", "A", " ", "1 ", "1-", "a.", "a@", "Aa "] + literals[:20]
+    for chars in alphabets:
+        body = (chars * (n // len(chars) + 1))[:n]
+        yield body + "\x00"
+        yield body + "!" + body
+
+
+def probe_backtracking(regex: str, flags: int = REGEX_FLAGS, budget: float = PROBE_BUDGET_SECONDS) -> Optional[str]:
+    """
+    Search regex over growing adversarial inputs; return a description of the first
+    input that takes longer than budget seconds, or None if it stays fast.
+    """
+    compiled = re.compile(regex, flags)
+    for n in _PROBE_LENGTHS:
+        for text in _probe_inputs(regex, n):
+            start = time.perf_counter()
+            compiled.search(text)
+            elapsed = time.perf_counter() - start
+            if elapsed > budget:
+                return f"{elapsed:.3f}s on {len(text)} chars of {text[:8]!r}..."
+    return None
+
+
+# ---------- Combined form ----------
+def combined_pattern(items) -> str:
+    """
+    One alternation over (label, regex) pairs, each wrapped in a named group _p<i>,
+    as the detector compiles it (with REGEX_FLAGS) for any subset of the table.
+    """
+    return "|".join(f"(?P<_p{i}>{regex})" for i, (_, regex) in enumerate(items))
+
+
+# An escape (skipped), a numbered backreference \N, or a numbered conditional (?(N)
+_NUMBERED_REFERENCE = re.compile(r"\\([1-9])|\\.|(\(\?\(\d)")
+
+
+def _check_combinable(label: str, regex: str, table: Dict[str, str] = None):
+    """
+    Raise ValueError unless regex works inside combined_pattern next to the other
+    patterns of table (default: patterns). Numbered backreferences are rejected
+    outright: the wrapping groups renumber them, so they would silently point at
+    another group.
+    """
+    for m in _NUMBERED_REFERENCE.finditer(regex):
+        if m.group(1) or m.group(2):
+            raise ValueError(f"Pattern {label!r} uses a numbered group reference; "
+                             f"use a named group (?P<name>...) and (?P=name) instead")
+    table = patterns if table is None else table
+    others = [(name, r) for name, r in tuple(table.items()) if name != label]
+    # The pattern may end up first or last in the alternation (and alone)
+    for items in ([(label, regex)] + others, others + [(label, regex)]):
+        try:
+            re.compile(combined_pattern(items), REGEX_FLAGS)
+        except re.error as e:
+            raise ValueError(f"Pattern {label!r} cannot be combined with the other patterns: {e}") from None
+
+
+# ---------- Registration ----------
+def register_pattern(label: str, regex: str, validator: Callable[[str], bool] = None,
+                     check_backtracking: bool = True):
+    """
+    Add (or replace) a pattern. Raises ValueError if regex does not compile, on its
+    own or within the combined alternation (global inline flags such as (?i) and
+    numbered backreferences are not allowed), or backtracks badly on adversarial
+    input (check_backtracking=False skips the probe).
+    """
+    _check_alone(label, regex, check_backtracking)
+    with _table_lock:
+        _check_combinable(label, regex)
+        patterns[label] = regex
+        if validator is not None:
+            VALIDATORS[label] = validator
+        else:
+            VALIDATORS.pop(label, None)
+
+
+def _check_alone(label: str, regex: str, check_backtracking: bool = True):
+    """The checks of register_pattern that do not depend on the rest of the table."""
+    try:
+        re.compile(regex, REGEX_FLAGS)
+    except re.error as e:
+        raise ValueError(f"Invalid regex for pattern {label!r}: {e}") from None
+    if check_backtracking:
+        slow = probe_backtracking(regex)
+        if slow:
+            raise ValueError(f"Pattern {label!r} backtracks catastrophically: {slow}")
+
+
+def load_custom_patterns(config_rules: Dict, replace: bool = False) -> Dict[str, str]:
+    """
+    Register config_rules["custom_patterns"] ({label: regex}); returns the
+    patterns that were rejected, with the reason. Already registered identical
+    patterns are skipped.
+
+    With replace (a rules reload), the configured patterns replace the ones
+    loaded before: custom patterns that are no longer configured, or are now
+    rejected, are removed, and a built-in one they overrode comes back. The new
+    table is built and checked on the side, then applied with the stale labels
+    deleted first and everything else in a single dict update, so a scan that
+    snapshots the table (tuple(patterns.items())) sees a table in which every
+    pattern was checked against the others.
+    """
+    custom = config_rules.get("custom_patterns") or {}
+    rejected = {}
+    if not replace:
+        for label, regex in custom.items():
+            if patterns.get(label) == regex:
+                continue
+            try:
+                register_pattern(label, regex)
+            except ValueError as e:
+                rejected[label] = str(e)
+            else:
+                _custom_labels.add(label)
+        return rejected
+
+    # Probing is the slow part; do it before taking the lock
+    for label, regex in custom.items():
+        if patterns.get(label) != regex:
+            try:
+                _check_alone(label, regex)
+            except ValueError as e:
+                rejected[label] = str(e)
+    with _table_lock:
+        current = tuple(patterns.items())
+        table = {}
+        for label, regex in current:
+            if label not in _custom_labels:
+                table[label] = regex
+            elif label in custom and label not in rejected:
+                table[label] = custom[label]
+            elif label in _BUILTIN_PATTERNS:
+                table[label] = _BUILTIN_PATTERNS[label]
+        accepted = set()
+        for label, regex in custom.items():
+            if label not in rejected:
+                try:
+                    _check_combinable(label, regex, {**table, label: regex})
+                except ValueError as e:
+                    rejected[label] = str(e)
+                else:
+                    table[label] = regex
+                    accepted.add(label)
+                    continue
+            # Rejected: fall back to the built-in pattern, or to no pattern
+            if label in _custom_labels:
+                if label in _BUILTIN_PATTERNS:
+                    table[label] = _BUILTIN_PATTERNS[label]
+                else:
+                    table.pop(label, None)
+
+        for label, _ in current:
+            if label not in table:
+                del patterns[label]
+                VALIDATORS.pop(label, None)
+        patterns.update(table)
+        for label in set(_custom_labels) | accepted:
+            if label in accepted:
+                VALIDATORS.pop(label, None)
+            elif label in _BUILTIN_VALIDATORS:
+                VALIDATORS[label] = _BUILTIN_VALIDATORS[label]
+        _custom_labels.clear()
+        _custom_labels.update(accepted)
+    return rejected
+
+
+# ---------- Statistics ----------
+def record_stat(label: str, key: str, value: float):
+    entry = _stats.setdefault(label, {"cells": 0, "rejected": 0, "seconds": 0.0})
+    entry[key] += value
+
+
+def pattern_stats(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Per-pattern counters for this process: {"cells": cells matched,
+    "rejected": candidates failing the validator, "seconds": regex time}.
+    """
+    stats = {label: dict(entry) for label, entry in _stats.items()}
+    if reset:
+        _stats.clear()
+    return stats
@@ -1,13 +1,24 @@
 # modules/report_generator.py
 
-from fpdf import FPDF
 import csv
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
-def generate_csv_report(results, score, violations):
-    os.makedirs("output", exist_ok=True)
-    with open("output/compliance_report.csv", mode='w', newline='') as file:
+# Findings listed in the PDF detail table; the CSV report always has all of them
+PDF_MAX_FINDINGS = 1000
+# Background report renderers (shared by every run of the process)
+REPORT_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def generate_csv_report(results, score, violations, output_dir="output"):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "compliance_report.csv")
+    with open(path, mode='w', newline='') as file:
         writer = csv.writer(file)
         writer.writerow(["Column", "Pattern", "Matches Found"])
         for row in results:
@@ -23,38 +34,184 @@ def generate_csv_report(results, score, violations):
                 writer.writerow([v])
         else:
             writer.writerow(["None"])
+    return path
+
+def generate_findings_csv(index, df=None, output_path="output/findings.csv", page_size=10000):
+    """
+    Write every row-level finding of a FindingsIndex, page by page, without re-scanning.
+    With df, the matched text of each span is included.
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["Column", "Row", "Start", "End", "Pattern"] + (["Text"] if df is not None else []))
+        offset = 0
+        while True:
+            page = index.page(offset=offset, limit=page_size)
+            if not page:
+                break
+            for f in page:
+                row = [f["column"], f["row"], f["start"], f["end"], f["pattern"]]
+                if df is not None:
+                    row.append(str(df[f["column"]].iat[f["row"]])[f["start"]:f["end"]])
+                writer.writerow(row)
+            offset += len(page)
+
+# ---------- PDF ----------
+def _text(value):
+    """The core PDF fonts are Latin-1 only; anything else is replaced instead of failing."""
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+@lru_cache(maxsize=None)
+def _report_pdf_class():
+    """The report template class; fpdf is only imported once a PDF is rendered."""
+    from fpdf import FPDF
+
+    class _ReportPDF(FPDF):
+        """
+        Shared report template: one class-level layout, running header and page
+        numbers. The core font's metrics are loaded once per process by FPDF and
+        reused by every report rendered afterwards.
+        """
+        TITLE = "Data Privacy Compliance Report"
+        FONT = "Arial"
+        ROW_HEIGHT = 7
+        # (header, width) of the two tables
+        TYPE_COLUMNS = (("PII Type", 80), ("Columns", 40), ("Matches", 50))
+        FINDING_COLUMNS = (("Column", 85), ("PII Type", 55), ("Matches", 40))
+
+        def __init__(self):
+            super().__init__()
+            self.set_auto_page_break(True, margin=15)
+            self.alias_nb_pages()
+
+        def header(self):
+            if self.page_no() > 1:
+                self.set_font(self.FONT, 'I', 8)
+                self.cell(0, 6, self.TITLE, ln=True, align='R')
+
+        def footer(self):
+            self.set_y(-12)
+            self.set_font(self.FONT, 'I', 8)
+            self.cell(0, 6, f"Page {self.page_no()}/{{nb}}", align='C')
+
+        def section(self, title):
+            self.ln(4)
+            self.set_font(self.FONT, 'B', 12)
+            self.cell(0, 9, title, ln=True)
+            self.set_font(self.FONT, size=10)
+
+        def table(self, columns, rows):
+            """Rows of a table; the header row is repeated at the top of every page."""
+            def header_row():
+                self.set_font(self.FONT, 'B', 10)
+                for title, width in columns:
+                    self.cell(width, self.ROW_HEIGHT, title, border=1)
+                self.ln()
+                self.set_font(self.FONT, size=10)
+
+            header_row()
+            for row in rows:
+                if self.get_y() + self.ROW_HEIGHT > self.page_break_trigger:
+                    self.add_page()
+                    header_row()
+                for (_, width), value in zip(columns, row):
+                    self.cell(width, self.ROW_HEIGHT, _text(value)[:60], border=1)
+                self.ln()
+
+    return _ReportPDF
+
+def _aggregate_by_type(results):
+    """[(pattern, number of columns, total matches)], most matches first."""
+    totals = {}
+    for r in results:
+        columns, matches = totals.get(r["pattern"], (0, 0))
+        totals[r["pattern"]] = (columns + 1, matches + r["matches_found"])
+    return sorted(((p, c, m) for p, (c, m) in totals.items()), key=lambda t: (-t[2], t[0]))
 
-def generate_pdf_report(results, score, violations):
-    os.makedirs("output", exist_ok=True)
-    pdf = FPDF()
+def generate_pdf_report(results, score, violations, output_dir="output", max_findings=PDF_MAX_FINDINGS):
+    """
+    Compliance PDF: score, violations, a table aggregated per PII type and a
+    paginated per-column findings table (capped at max_findings rows; the CSV
+    report holds the full list).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pdf = _report_pdf_class()()
     pdf.add_page()
-    pdf.set_font("Arial", size=12)
-
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    pdf.cell(200, 10, txt="Data Privacy Compliance Report", ln=True, align='C')
-    pdf.cell(200, 10, txt=f"Generated: {timestamp}", ln=True, align='C')
-    pdf.ln(10)
-
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="PII Detection Summary", ln=True)
-    pdf.set_font("Arial", size=12)
-    for row in results:
-        pdf.cell(200, 10, txt=f"- {row['column']} matched {row['pattern']} ({row['matches_found']}x)", ln=True)
-
-    pdf.ln(5)
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Compliance Score", ln=True)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"{score}%", ln=True)
-
-    pdf.ln(5)
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(200, 10, txt="Violations", ln=True)
-    pdf.set_font("Arial", size=12)
+
+    pdf.set_font(pdf.FONT, 'B', 14)
+    pdf.cell(0, 10, pdf.TITLE, ln=True, align='C')
+    pdf.set_font(pdf.FONT, size=10)
+    pdf.cell(0, 6, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align='C')
+
+    pdf.section("Compliance Score")
+    pdf.cell(0, 7, f"{score}%", ln=True)
+
+    pdf.section("Violations")
     if violations:
         for v in violations:
-            pdf.cell(200, 10, txt=f"- {v}", ln=True)
+            pdf.multi_cell(0, 6, _text(f"- {v}"))
     else:
-        pdf.cell(200, 10, txt="None ", ln=True)
+        pdf.cell(0, 7, "None", ln=True)
+
+    pdf.section("PII Detection Summary")
+    if results:
+        pdf.table(pdf.TYPE_COLUMNS, _aggregate_by_type(results))
+        ranked = sorted(results, key=lambda r: -r["matches_found"])
+        pdf.section(f"Findings by Column ({len(results)})")
+        pdf.table(pdf.FINDING_COLUMNS,
+                  ((r["column"], r["pattern"], r["matches_found"]) for r in ranked[:max_findings]))
+        if len(ranked) > max_findings:
+            pdf.ln(2)
+            pdf.cell(0, 6, f"... {len(ranked) - max_findings} more findings in compliance_report.csv", ln=True)
+    else:
+        pdf.cell(0, 7, "No PII detected", ln=True)
+
+    path = os.path.join(output_dir, "compliance_report.pdf")
+    pdf.output(path)
+    return path
+
+# ---------- Background and on-demand rendering ----------
+_RENDERERS = {"csv": generate_csv_report, "pdf": generate_pdf_report}
+
+def _render(results, score, violations, output_dir, formats):
+    return {fmt: _RENDERERS[fmt](results, score, violations, output_dir=output_dir) for fmt in formats}
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+        return _executor
+
+def submit_reports(results, score, violations, output_dir="output", formats=("csv", "pdf")):
+    """
+    Render the reports on a background thread so the caller can carry on.
+    Returns a Future resolving to {format: path}. results/violations must not be
+    modified afterwards (copies are not taken).
+    """
+    return _get_executor().submit(_render, results, score, violations, output_dir, tuple(formats))
+
+class LazyReports:
+    """Reports rendered only when first requested, then served from disk."""
+
+    def __init__(self, results, score, violations, output_dir="output"):
+        self.results = results
+        self.score = score
+        self.violations = violations
+        self.output_dir = output_dir
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def path(self, fmt):
+        with self._lock:
+            if fmt not in self._paths:
+                self._paths[fmt] = _RENDERERS[fmt](self.results, self.score, self.violations,
+                                                   output_dir=self.output_dir)
+            return self._paths[fmt]
+
+    def csv(self):
+        return self.path("csv")
 
-    pdf.output("output/compliance_report.pdf")
+    def pdf(self):
+        return self.path("pdf")
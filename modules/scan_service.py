@@ -0,0 +1,308 @@
+# modules/scan_service.py
+
+"""
+Long-running scan service.
+
+Keeps everything a scan needs warm in one process: pandas and the detector
+(patterns compiled at import), the compiled compliance rules and the pseudonym
+mapping store. Jobs are accepted over HTTP on localhost (or a Unix socket),
+queued, and run by a bounded pool of worker threads. Results are cached by a
+hash of the uploaded bytes and the scan options, so a duplicate upload is
+answered without scanning.
+
+    python -m modules.scan_service --port 8765 --workers 2
+
+API (JSON responses):
+    POST /jobs?filename=data.csv[&anonymize=1][&wait=1]   body: the file's bytes
+         -> 202 {"job_id", "status": "queued"}; 200 with the finished job when
+            cached or when wait=1
+    GET  /jobs/<job_id>   -> {"job_id", "status", "cached", "result" | "error"}
+            status: queued / running / done / failed
+            result: {"source", "rows", "results", "score", "violations", "anon_report"}
+    GET  /health          -> {"status": "ok", "queued", "running", "jobs", "cached_results"}
+    POST /rules/reload    -> reload the rules file; {"status": "reloaded", "rejected": {label: reason}}
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socketserver
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+from modules.anonymize_data import anonymize_dataset, ANON_MAP_BACKEND
+from modules.compliance_scoring import compile_rules, config_hash
+from modules.file_loader import load_data, load_arrow_table, SUPPORTED_EXTENSIONS, MEMORY_MAPPED_EXTENSIONS
+from modules.history_logger import log_scan_history
+from modules.mapping_store import open_mapping_store
+from modules.pattern_registry import load_custom_patterns, patterns
+from modules.pii_detector import detect_sensitive_data, detect_sensitive_data_arrow
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+# Jobs waiting for a worker; further submissions get 503 until the queue drains
+MAX_QUEUED_JOBS = 100
+# Finished results kept for duplicate uploads, and finished jobs kept for polling
+RESULT_CACHE_SIZE = 1024
+JOB_HISTORY_SIZE = 10000
+MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+
+
+def _json_default(value):
+    # numpy scalars from pandas reductions
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class ScanService:
+    """Warm scan state, job table, bounded worker pool and result cache."""
+
+    def __init__(self, rules_path: str = "config/rules.json", workers: int = DEFAULT_WORKERS,
+                 max_queued: int = MAX_QUEUED_JOBS, log_history: bool = True):
+        self.rules_path = rules_path
+        self.workers = workers
+        self.max_queued = max_queued
+        self.log_history = log_history
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending = 0
+        self._running = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+        self.reload_rules()
+        # Open the mapping store now so the first pseudonymizing job does not pay for it
+        open_mapping_store(ANON_MAP_BACKEND)
+
+    def reload_rules(self) -> Dict[str, str]:
+        """
+        Re-read the rules file. Its custom patterns replace the previous ones (labels
+        no longer configured are dropped) together with the rules, under the service
+        lock. Returns the rejected custom patterns with the reason.
+        """
+        with open(self.rules_path, "r") as file:
+            rules = json.load(file)
+        compile_rules(rules)
+        with self._lock:
+            rejected = load_custom_patterns(rules, replace=True)
+            self.rules = rules
+        return rejected
+
+    # ---------- Jobs ----------
+    def _cache_key(self, data: bytes, filename: str, anonymize: bool) -> str:
+        h = hashlib.sha256(data)
+        h.update(os.path.splitext(filename)[1].lower().encode("utf-8"))
+        h.update(f"|{anonymize}|{config_hash(self.rules)}|".encode("utf-8"))
+        h.update(json.dumps(list(patterns.items())).encode("utf-8"))
+        return h.hexdigest()
+
+    def submit(self, data: bytes, filename: str, anonymize: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Queue a scan of data (the contents of filename). Returns the job; a cached
+        result returns an already finished job. Raises OverflowError when the queue is full.
+        """
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError(f"Unsupported file format: {filename}")
+        if anonymize is None:
+            anonymize = bool(self.rules.get("anonymization_required", False))
+        key = self._cache_key(data, filename, anonymize)
+        job = {"job_id": uuid.uuid4().hex, "status": "queued", "cached": False, "source": filename,
+               "done": threading.Event()}
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                job.update(status="done", cached=True, result=cached)
+                job["done"].set()
+            elif self._pending >= self.max_queued:
+                raise OverflowError("Scan queue is full")
+            else:
+                self._pending += 1
+            self._remember(job)
+        if not job["cached"]:
+            self._pool.submit(self._run, job, data, filename, anonymize, key)
+        return job
+
+    def _remember(self, job):
+        self._jobs[job["job_id"]] = job
+        while len(self._jobs) > JOB_HISTORY_SIZE:
+            self._jobs.popitem(last=False)
+
+    def _run(self, job, data, filename, anonymize, key):
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+            job["status"] = "running"
+        try:
+            result = self.scan_bytes(data, filename, anonymize)
+            with self._lock:
+                self._cache[key] = result
+                while len(self._cache) > RESULT_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+                job.update(status="done", result=result)
+        except Exception as e:
+            with self._lock:
+                job.update(status="failed", error=f"{type(e).__name__}: {e}")
+        finally:
+            with self._lock:
+                self._running -= 1
+            job["done"].set()
+
+    def scan_bytes(self, data: bytes, filename: str, anonymize: bool) -> Dict[str, Any]:
+        """
+        Detect, optionally anonymize, and score one upload with the warm state.
+        Parquet/Feather uploads that are not anonymized are scanned as an Arrow
+        table, without converting them to a DataFrame.
+        """
+        rules = self.rules
+        suffix = os.path.splitext(filename)[1].lower()
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        df = None
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            if not anonymize and suffix.endswith(MEMORY_MAPPED_EXTENSIONS):
+                table = load_arrow_table(path)
+                rows = table.num_rows
+                results = detect_sensitive_data_arrow(table)
+                del table  # release the memory map before the file is removed
+            else:
+                df = load_data(path)
+                rows = len(df)
+        finally:
+            os.remove(path)
+        if df is not None:
+            results = detect_sensitive_data(df)
+        anon_report = None
+        if anonymize:
+            _, anon_report = anonymize_dataset(df, results, method_config=dict.fromkeys(tuple(patterns), "mask"),
+                                               inplace=True)
+        score, violations = compile_rules(rules).score(results, anon_report)
+        if self.log_history:
+            log_scan_history(results, score, violations, filename, anon_report)
+        return {"source": filename, "rows": rows, "results": results, "score": score,
+                "violations": violations, "anon_report": anon_report}
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"status": "ok", "queued": self._pending, "running": self._running,
+                    "jobs": len(self._jobs), "cached_results": len(self._cache)}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """The JSON-facing part of a job."""
+    view = {"job_id": job["job_id"], "status": job["status"], "cached": job["cached"], "source": job["source"]}
+    if "result" in job:
+        view["result"] = job["result"]
+    if "error" in job:
+        view["error"] = job["error"]
+    return view
+
+
+# ---------- HTTP ----------
+class _Handler(BaseHTTPRequestHandler):
+    service: ScanService = None
+
+    def address_string(self):
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send(self, code, payload):
+        body = json.dumps(payload, default=_json_default).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            return self._send(200, self.service.status())
+        if path.startswith("/jobs/"):
+            job = self.service.job(path[len("/jobs/"):])
+            if job is None:
+                return self._send(404, {"error": "Unknown job"})
+            return self._send(200, job_view(job))
+        self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/rules/reload":
+            try:
+                rejected = self.service.reload_rules()
+            except Exception as e:
+                return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return self._send(200, {"status": "reloaded", "rejected": rejected})
+        if url.path != "/jobs":
+            return self._send(404, {"error": "Not found"})
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_UPLOAD_BYTES:
+            return self._send(400, {"error": "Missing or too large request body"})
+        data = self.rfile.read(length)
+        filename = query.get("filename", ["upload.csv"])[0]
+        anonymize = None
+        if "anonymize" in query:
+            anonymize = query["anonymize"][0].lower() in ("1", "true", "yes")
+        try:
+            job = self.service.submit(data, filename, anonymize)
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        except OverflowError as e:
+            return self._send(503, {"error": str(e)})
+        if query.get("wait", ["0"])[0].lower() in ("1", "true", "yes"):
+            job["done"].wait()
+        self._send(200 if job["done"].is_set() else 202, job_view(job))
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: ScanService, host: str = "127.0.0.1", port: int = DEFAULT_PORT, socket_path: str = None):
+    """HTTP server for service on host:port, or on a Unix socket at socket_path."""
+    handler = type("ScanHandler", (_Handler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return _UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local PII scan service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--rules", default="config/rules.json")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--max-queued", type=int, default=MAX_QUEUED_JOBS)
+    parser.add_argument("--no-history", action="store_true")
+    args = parser.parse_args()
+
+    service = ScanService(args.rules, args.workers, args.max_queued, log_history=not args.no_history)
+    server = make_server(service, args.host, args.port, args.socket)
+    print(f"Scan service listening on {args.socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
@@ -0,0 +1,82 @@
+# modules/stream_scanner.py
+
+"""
+Chunked scanning for files that do not fit in memory.
+
+The file is read in fixed-size chunks twice:
+- pass 1 runs detection on every chunk and merges the per-column match counts
+- pass 2 (only when anonymization is requested) anonymizes every chunk with the
+  merged detections and appends it to the output CSV
+
+Using the merged detections in pass 2 means a column is anonymized in every row
+even if its PII only shows up in later chunks, exactly as a whole-file scan would.
+Only one chunk is held in memory at a time.
+"""
+
+import os
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from modules.file_loader import iter_data, DEFAULT_CHUNKSIZE
+from modules.pii_detector import detect_sensitive_data, merge_detection_results
+from modules.anonymize_data import anonymize_dataset, merge_anon_reports
+
+
+def scan_chunks(chunks) -> Tuple[List[Dict[str, Any]], int]:
+    """Run detection on each chunk; return (merged results, rows scanned)."""
+    partials = []
+    rows = 0
+    columns = None
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+        partials.append(detect_sensitive_data(chunk))
+        rows += len(chunk)
+    return merge_detection_results(partials, columns), rows
+
+
+def anonymize_file_streaming(path: str, detections: List[Dict[str, Any]],
+                             output_path: str = "output/anonymized_data.csv",
+                             chunksize: int = DEFAULT_CHUNKSIZE,
+                             method_config: Dict[str, str] = None,
+                             persist_map: bool = True) -> Dict[str, Any]:
+    """Anonymize path chunk by chunk, writing the CSV incrementally. Returns the merged anon_report."""
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    reports = []
+    first = True
+    for chunk in iter_data(path, chunksize=chunksize):
+        anonymized, report = anonymize_dataset(chunk, detections, method_config=method_config,
+                                               persist_map=persist_map, inplace=True)
+        anonymized.to_csv(output_path, mode="w" if first else "a", header=first, index=False)
+        reports.append(report)
+        first = False
+
+    if first:
+        # Empty input: still leave an (empty) output file behind
+        open(output_path, "w").close()
+    return merge_anon_reports(reports)
+
+
+def scan_file_streaming(path: str, anonymize: bool = False,
+                        output_path: str = "output/anonymized_data.csv",
+                        chunksize: int = DEFAULT_CHUNKSIZE,
+                        method_config: Dict[str, str] = None,
+                        persist_map: bool = True) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Returns:
+        results, anon_report
+        results has the same records as detect_sensitive_data on the whole file
+        (for CSV, on the file read as text, see iter_data: the same whatever the
+        chunk boundaries); anon_report is None unless anonymize is True.
+    """
+    results, rows = scan_chunks(iter_data(path, chunksize=chunksize))
+    logging.info(f"Scanned {rows} rows in chunks of {chunksize}")
+
+    anon_report = None
+    if anonymize:
+        anon_report = anonymize_file_streaming(path, results, output_path=output_path, chunksize=chunksize,
+                                               method_config=method_config, persist_map=persist_map)
+    return results, anon_report
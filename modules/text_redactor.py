@@ -0,0 +1,92 @@
+# modules/text_redactor.py
+
+"""
+Span-level redaction for free-text columns.
+
+Instead of replacing a whole cell, every PII span inside the text is replaced
+by a format-preserving mask and the text between spans is left untouched:
+
+    "mail jane@example.com, ring +251912345678"  ->  "mail j***@example.com, ring +*********678"
+
+Spans come from the detector's own engine (find_spans, and the findings index
+for whole columns) over the shared patterns table, custom patterns included,
+with two entries swapped for prose (PROSE_PATTERNS): the table's phone pattern
+only knows the Ethiopian format, and its Name pattern runs case-insensitively,
+which in prose matches nearly every pair of adjacent words.
+"""
+
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from modules.findings import anonymize_spans, build_findings_index
+from modules.pii_detector import find_spans, patterns
+
+# Replacements for shared patterns that do not fit free text
+PROSE_PATTERNS = {
+    'phone': r'\+\d{1,3}(?:[ .-]?\(?\d{2,4}\)?){2,4}(?!\d)(?:\s?(?:x|ext\.?)\s?\d{1,6})?',  # any country code
+    'Name': r'(?-i:\b[A-Z][a-z]+ [A-Z][a-z]+\b)',  # "First Last", case-sensitive
+}
+
+# Trailing digits/letters left readable per type (other types are masked entirely)
+KEEP_LAST = {'phone': 3, 'SSN': 4, 'Credit Card': 4, 'national_id': 0}
+
+
+def redaction_patterns(types: List[str] = None) -> Tuple[Tuple[str, str], ...]:
+    """(label, regex) pairs redacted in text: the patterns table with PROSE_PATTERNS swapped in."""
+    return tuple((label, PROSE_PATTERNS.get(label, regex)) for label, regex in tuple(patterns.items())
+                 if types is None or label in types)
+
+
+def _mask_chars(text: str, keep_last: int) -> str:
+    """'*' for every letter/digit except the last keep_last; punctuation and '+' are kept."""
+    alnum_positions = [i for i, ch in enumerate(text) if ch.isalnum()]
+    keep = set(alnum_positions[-keep_last:]) if keep_last > 0 else set()
+    return "".join(ch if (not ch.isalnum() or i in keep) else "*" for i, ch in enumerate(text))
+
+
+def mask_span(label: str, text: str) -> str:
+    """Format-preserving mask of one PII span of the given type."""
+    if label == 'email' and "@" in text:
+        local, domain = text.split("@", 1)
+        return f"{local[:1]}{'*' * max(len(local) - 1, 1)}@{domain}"
+    if label == 'Name':
+        # Keep initials: "Nelson Mandela" -> "N***** M******"
+        return " ".join(w[:1] + "*" * (len(w) - 1) for w in text.split(" "))
+    return _mask_chars(text, KEEP_LAST.get(label, 0))
+
+
+def redact_text(text: str, types: List[str] = None) -> Tuple[str, Dict[str, int]]:
+    """
+    Redact all PII spans in text (of the given types, default: every pattern).
+    Returns (redacted_text, {type: spans redacted}).
+    """
+    counts = {}
+    parts = []
+    pos = 0
+    for start, end, label in find_spans(text, redaction_patterns(types)):
+        parts.append(text[pos:start])
+        parts.append(mask_span(label, text[start:end]))
+        pos = end
+        counts[label] = counts.get(label, 0) + 1
+    if not counts:
+        return text, counts
+    parts.append(text[pos:])
+    return "".join(parts), counts
+
+
+def redact_text_series(series: pd.Series, types: List[str] = None,
+                       counts: Dict[str, int] = None) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    redact_text for every cell, through the findings index (each distinct text is
+    scanned once). Returns (redacted_series, {type: spans redacted}, counted over all rows).
+    counts, if given, gets "pii" and "changed" incremented by the number of
+    cells containing at least one span (as in anonymize_data's primitives).
+    """
+    frame = pd.DataFrame({0: series})
+    index = build_findings_index(frame, items=redaction_patterns(types))
+    frame, report = anonymize_spans(frame, index, replace=mask_span, inplace=True)
+    if counts is not None:
+        counts["pii"] = counts.get("pii", 0) + report["cells_rewritten"]
+        counts["changed"] = counts.get("changed", 0) + report["cells_rewritten"]
+    return pd.Series(frame[0].to_numpy(), index=series.index, name=series.name), report["spans_by_type"]
@@ -0,0 +1,101 @@
+# test_anonymize_data.py
+
+import threading
+import unittest
+import numpy as np
+import pandas as pd
+from modules.anonymize_data import (
+    mask_value_series, mask_email_series, mask_phone_series, hash_value_series,
+    redact_series, fake_email_series, fake_phone_series, pseudonymize_series, anonymize_dataset,
+)
+
+class TestAnonymizePrimitives(unittest.TestCase):
+    def setUp(self):
+        self.series = pd.Series(['jane@example.com', '+251912345678', np.nan, 'nan', 'jane@example.com'])
+
+    def test_masking(self):
+        self.assertEqual(mask_email_series(self.series).tolist()[0], 'j***@example.com')
+        self.assertEqual(mask_phone_series(pd.Series(['+251912345678', '12'])).tolist(), ['+*********678', '**'])
+        self.assertEqual(mask_value_series(pd.Series(['abcdef', None]), keep_last=2).tolist(), ['****ef', ''])
+
+    def test_redact_keeps_missing(self):
+        out = redact_series(self.series)
+        self.assertEqual(out[0], 'REDACTED')
+        self.assertTrue(pd.isna(out[2]))
+        self.assertEqual(out[3], 'nan')
+
+    def test_hash_based_methods_are_deterministic(self):
+        for fn in (hash_value_series, fake_email_series, fake_phone_series):
+            out = fn(self.series)
+            self.assertEqual(out[0], out[4])
+            self.assertNotEqual(out[0], out[1])
+            self.assertTrue(pd.isna(out[2]))
+        pseudo = pseudonymize_series(self.series, persist_map=False)
+        self.assertTrue(pseudo[0].startswith('USER_'))
+        self.assertEqual(pseudo[0], pseudo[4])
+
+    def test_nullable_and_categorical_input(self):
+        ids = pd.Series([1, None, 3], dtype='Int64')
+        counts = {}
+        out = redact_series(ids, counts=counts)
+        self.assertEqual([out[0], out[2]], ['REDACTED', 'REDACTED'])
+        self.assertTrue(pd.isna(out[1]))
+        self.assertEqual(counts, {'pii': 2, 'changed': 2})
+        self.assertTrue(pd.isna(hash_value_series(ids)[1]))
+        # Series.apply passed 1.0 and 3.0 once a value was missing; the kernels see the same
+        self.assertEqual(mask_phone_series(ids).tolist()[::2], ['**', '**'])
+        self.assertEqual(fake_phone_series(ids)[0], fake_phone_series(pd.Series([1.0]))[0])
+        self.assertEqual(pseudonymize_series(ids, persist_map=False)[2],
+                         pseudonymize_series(pd.Series([3.0]), persist_map=False)[0])
+
+        cats = self.series.astype('category')
+        counts = {}
+        out = hash_value_series(cats, counts=counts)
+        self.assertIsInstance(out.dtype, pd.CategoricalDtype)
+        self.assertEqual(out.astype(str).tolist(), hash_value_series(self.series).astype(str).tolist())
+        self.assertEqual(counts, {'pii': 3, 'changed': 3})
+        # Not one-to-one (every value becomes the token): dense, like Series.apply
+        self.assertNotIsInstance(redact_series(cats).dtype, pd.CategoricalDtype)
+
+    def test_all_missing_columns(self):
+        for series in (pd.Series([np.nan, None], dtype=object), pd.Series([np.nan]), pd.Series([None], dtype='Int64')):
+            out = mask_email_series(series, counts={})
+            self.assertTrue(out.isna().all())
+        # A slice whose email rows are all missing, as in a trailing chunk
+        df = pd.DataFrame({'email': ['a@example.com', np.nan, np.nan]})
+        detections = [{'column': 'email', 'pattern': 'email', 'matches_found': 1}]
+        out, report = anonymize_dataset(df.iloc[1:], detections)
+        self.assertTrue(out['email'].isna().all())
+        self.assertEqual(report['total_pii_values'], 0)
+
+    def test_digest_cache_counts_in_report(self):
+        df = pd.DataFrame({'id_a': ['QZ10000001', 'QZ10000002'], 'id_b': ['QZ10000001', 'QZ10000002']})
+        detections = [{'column': 'id_a', 'pattern': 'national_id', 'matches_found': 2},
+                      {'column': 'id_b', 'pattern': 'national_id', 'matches_found': 2}]
+        # Another thread hashing at the same time must not show up in this call's counts
+        busy = threading.Thread(target=lambda: [hash_value_series(pd.Series([f'v{i}' for i in range(2000)]))
+                                                for _ in range(20)])
+        busy.start()
+        out, report = anonymize_dataset(df, detections)
+        busy.join()
+        self.assertEqual(out['id_a'].tolist(), out['id_b'].tolist())
+        # The second column is served entirely from the cache
+        self.assertEqual((report['hash_cache_hits'], report['hash_cache_misses']), (2, 2))
+
+    def test_inplace_with_counts_from_kernels(self):
+        df = pd.DataFrame({'email': ['a@example.com', np.nan, 'nan', 'b@example.com'], 'n': [1, 2, 3, 4]})
+        detections = [{'column': 'email', 'pattern': 'email', 'matches_found': 2}]
+        copy_out, copy_report = anonymize_dataset(df, detections, method_config={'email': 'hash'})
+        self.assertEqual(df['email'][0], 'a@example.com')
+        out, report = anonymize_dataset(df, detections, method_config={'email': 'hash'}, inplace=True)
+        self.assertIs(out, df)
+        self.assertTrue(out.equals(copy_out))
+        # Missing values and the literal 'nan' are neither PII values nor changes
+        self.assertEqual((report['total_pii_values'], report['anonymized_count']), (2, 2))
+        self.assertTrue(report['verification_passed'])
+        counts = {}
+        mask_email_series(pd.Series(['a@example.com', 'no-at', None]), counts=counts)
+        self.assertEqual(counts, {'pii': 2, 'changed': 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# test_batch_cli.py
+
+import csv
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+import main
+from modules import history_logger
+
+class TestBatchCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        for sub in ("a", "b"):
+            os.makedirs(os.path.join(root, "in", sub))
+            pd.DataFrame({'email': ['x@example.com', 'y@example.com'], 'n': [1, 2]}).to_csv(
+                os.path.join(root, "in", sub, "data.csv"), index=False)
+        with open(os.path.join(root, "in", "broken.csv"), "w") as f:
+            f.write('a,b\n"unterminated\n')
+        self.rules = os.path.join(root, "rules.json")
+        with open(self.rules, "w") as f:
+            json.dump({"max_pii_fields": 2, "allowed_pii_types": ["email"], "anonymization_required": True}, f)
+        self._saved = history_logger.HISTORY_DB
+        history_logger.HISTORY_DB = os.path.join(root, "history.db")
+
+    def tearDown(self):
+        history_logger.HISTORY_DB = self._saved
+        self.tmp.cleanup()
+
+    def test_expand_inputs(self):
+        inputs = os.path.join(self.tmp.name, "in")
+        self.assertEqual(len(main.expand_inputs([inputs])), 3)
+        self.assertEqual(len(main.expand_inputs([os.path.join(inputs, "*", "*.csv")])), 2)
+
+    def test_batch_writes_per_input_outputs_and_summary(self):
+        out = os.path.join(self.tmp.name, "out")
+        summaries = main.scan_batch([os.path.join(self.tmp.name, "in")], self.rules, out, workers=2)
+        self.assertEqual(len(summaries), 3)
+        self.assertEqual(len([s for s in summaries if "error" in s]), 1)
+        for s in summaries:
+            if "error" not in s:
+                self.assertEqual(set(s["reports"]), {"csv", "pdf"})
+        for sub in ("a", "b"):
+            out_dir = os.path.join(out, sub, "data.csv")
+            for name in ("compliance_report.csv", "compliance_report.pdf", "anonymized_data.csv", "results.csv"):
+                self.assertTrue(os.path.exists(os.path.join(out_dir, name)), name)
+        with open(os.path.join(out, "batch_summary.csv")) as f:
+            self.assertEqual(len(list(csv.reader(f))), 4)
+        self.assertEqual(len(history_logger.load_scan_history()), 2)
+        self.assertEqual(len(history_logger.load_scan_metrics()), 2)
+
+    def test_output_dirs_do_not_collide(self):
+        root = os.path.join(self.tmp.name, "in")
+        nested = main.output_dir_for(os.path.join(root, "a", "b.csv"), root, "out")
+        flat = main.output_dir_for(os.path.join(root, "a__b.csv"), root, "out")
+        self.assertNotEqual(nested, flat)
+        self.assertEqual(nested, os.path.join("out", "a", "b.csv"))
+
+    def test_main_records_report_stages(self):
+        out = os.path.join(self.tmp.name, "out")
+        record = main.main(os.path.join(self.tmp.name, "in", "a", "data.csv"), rules_path=self.rules, output_dir=out)
+        self.assertIn("report_csv", record["stages"])
+        self.assertIn("report_pdf", record["stages"])
+        self.assertTrue(os.path.exists(os.path.join(out, "compliance_report.pdf")))
+
+if __name__ == '__main__':
+    unittest.main()
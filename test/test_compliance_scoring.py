@@ -0,0 +1,58 @@
+# test_compliance_scoring.py
+
+import unittest
+from modules.compliance_scoring import score_compliance, compile_rules, register_rule, Rule, _RULE_BUILDERS
+
+class TestComplianceScoring(unittest.TestCase):
+    def setUp(self):
+        self.detected = [{'column': 'email', 'pattern': 'email', 'matches_found': 3},
+                         {'column': 'notes', 'pattern': 'Name', 'matches_found': 5},
+                         {'column': 'notes', 'pattern': 'phone', 'matches_found': 1}]
+        self.rules = {"max_pii_fields": 2, "allowed_pii_types": ["email", "phone"], "anonymization_required": True}
+
+    def test_original_three_rules(self):
+        score, violations = score_compliance(self.detected, self.rules)
+        self.assertEqual(score, 0.0)
+        self.assertEqual(violations, ["Too many PII types detected: 3 > allowed 2",
+                                      "Disallowed PII type detected: Name",
+                                      "Anonymization not verified."])
+        self.assertEqual(score_compliance([], {}), (100.0, []))
+
+    def test_anon_report_is_checked(self):
+        verified = {'total_pii_values': 9, 'anonymized_count': 9, 'anonymization_rate': 100.0,
+                    'verification_passed': True}
+        self.assertEqual(score_compliance(self.detected[:1], self.rules, verified), (100.0, []))
+        partial = dict(verified, anonymized_count=6, anonymization_rate=66.67, verification_passed=False)
+        score, violations = score_compliance(self.detected[:1], dict(self.rules, min_anonymization_rate=90), partial)
+        self.assertEqual(score, 66.67)
+        self.assertEqual(len(violations), 2)
+
+    def test_column_and_threshold_rules(self):
+        rules = dict(self.rules, anonymization_required=False, max_pii_fields=5,
+                     allowed_pii_types=["email", "phone", "Name"],
+                     max_total_matches=8, type_thresholds={"Name": 4},
+                     column_rules={"email": {"allowed_pii_types": ["email"]},
+                                   "notes": {"allowed_pii_types": ["Name"], "max_matches": 10}})
+        score, violations = score_compliance(self.detected, rules)
+        self.assertEqual(violations, ["Too many PII values detected: 9 > allowed 8",
+                                      "Too many Name values detected: 5 > allowed 4",
+                                      "Disallowed PII type in column notes: phone"])
+        self.assertEqual(score, round(4 / 7 * 100, 2))
+
+    def test_compiled_rules_are_cached_by_config(self):
+        self.assertIs(compile_rules(self.rules), compile_rules(dict(reversed(list(self.rules.items())))))
+        self.assertIsNot(compile_rules(self.rules), compile_rules(dict(self.rules, max_pii_fields=3)))
+
+    def test_register_rule(self):
+        class NoNotes(Rule):
+            def check(self, facts, anon_report=None):
+                return ["notes column holds PII"] if "notes" in facts.column_types else []
+        register_rule(lambda config: [NoNotes()] if config.get("no_notes") else [])
+        try:
+            score, violations = score_compliance(self.detected, dict(self.rules, no_notes=True))
+            self.assertIn("notes column holds PII", violations)
+        finally:
+            _RULE_BUILDERS.pop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# test_db_scanner.py
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from modules.db_loader import load_sqlite_table, iter_sqlite_table, close_read_connections
+from modules.db_scanner import scan_sqlite_table, scan_sqlite_database
+from modules.pii_detector import detect_sensitive_data
+
+class TestDbScanner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "test.db")
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE customers (id INTEGER PRIMARY KEY, email TEXT, phone VARCHAR(20), balance REAL)")
+        conn.executemany("INSERT INTO customers (email, phone, balance) VALUES (?, ?, ?)",
+                         [(f"user{i}@example.com" if i % 3 else "n/a", f"+2519{i:08d}", i * 1.5) for i in range(25)])
+        conn.execute("CREATE TABLE tags (name TEXT PRIMARY KEY, note TEXT) WITHOUT ROWID")
+        conn.executemany("INSERT INTO tags VALUES (?, ?)", [(f"t{i}", "John Doe") for i in range(7)])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        close_read_connections()
+        self.tmp.cleanup()
+
+    def test_paged_scan_matches_full_load(self):
+        full = load_sqlite_table(self.db, "customers")
+        expected = detect_sensitive_data(full[["email", "phone"]])
+        results, rows = scan_sqlite_table(self.db, "customers", chunksize=4)
+        self.assertEqual(rows, 25)
+        self.assertEqual(results, expected)
+
+    def test_projection_and_without_rowid(self):
+        chunks = list(iter_sqlite_table(self.db, "customers", chunksize=10))
+        self.assertEqual(list(chunks[0].columns), ["email", "phone"])
+        self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+        results, rows = scan_sqlite_table(self.db, "tags", chunksize=3)
+        self.assertEqual(rows, 7)
+        self.assertIn({'column': 'note', 'pattern': 'Name', 'matches_found': 7}, results)
+
+    def test_database_scan_largest_first(self):
+        rules = {"max_pii_fields": 2, "allowed_pii_types": ["email", "phone"]}
+        serial = list(scan_sqlite_database(self.db, rules, log_history=False))
+        self.assertEqual([r["table"] for r in serial], ["customers", "tags"])
+        self.assertEqual(serial[1]["violations"], ["Disallowed PII type detected: Name"])
+        parallel = list(scan_sqlite_database(self.db, rules, workers=2, log_history=False))
+        self.assertEqual(sorted(r["table"] for r in parallel), ["customers", "tags"])
+        by_table = {r["table"]: r["results"] for r in parallel}
+        self.assertEqual(by_table["customers"], serial[0]["results"])
+
+if __name__ == '__main__':
+    unittest.main()
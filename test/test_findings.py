@@ -0,0 +1,47 @@
+# test_findings.py
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+from modules.findings import build_findings_index, anonymize_spans, FindingsIndex
+from modules.anonymize_data import anonymize_dataset
+
+class TestFindingsIndex(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'text': ['mail: jane@example.com, +251912345678', 'nothing', None, 'SSN 123-45-6789'],
+            'id': [1, 2, 3, 4],
+        })
+
+    def test_index_records_spans(self):
+        index = build_findings_index(self.df)
+        self.assertEqual(list(index.columns), ['text'])
+        self.assertEqual(index.rows('text').tolist(), [0, 3])
+        first = index.page(limit=1)[0]
+        self.assertEqual((first['row'], first['pattern']), (0, 'email'))
+        self.assertEqual(self.df['text'][0][first['start']:first['end']], 'jane@example.com')
+        self.assertEqual(len(index.page(offset=1, limit=10)), len(index) - 1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "findings.npz")
+            index.save(path)
+            loaded = FindingsIndex.load(path)
+            self.assertEqual(loaded.page(limit=100), index.page(limit=100))
+
+    def test_only_spans_are_rewritten(self):
+        index = build_findings_index(self.df)
+        out, report = anonymize_spans(self.df, index)
+        self.assertEqual(out['text'][0], 'mail: ****************, *************')
+        self.assertEqual(out['text'][1], 'nothing')
+        self.assertEqual(report['cells_rewritten'], 2)
+        self.assertEqual(self.df['text'][0], 'mail: jane@example.com, +251912345678')
+
+    def test_spans_method_in_anonymize_dataset(self):
+        detections = [{'column': 'text', 'pattern': 'email', 'matches_found': 1}]
+        out, anon_report = anonymize_dataset(self.df, detections, method_config={'email': 'spans'})
+        self.assertEqual(out['text'][3], 'SSN ***********')
+        self.assertTrue(anon_report['verification_passed'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# test_history_logger.py
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+import pandas as pd
+from modules import history_logger
+
+class TestHistoryLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self._saved = history_logger.HISTORY_DB, history_logger.HISTORY_FILE
+        history_logger.HISTORY_DB = os.path.join(self.tmp.name, "history.db")
+        history_logger.HISTORY_FILE = os.path.join(self.tmp.name, "history.csv")
+
+    def tearDown(self):
+        history_logger.HISTORY_DB, history_logger.HISTORY_FILE = self._saved
+        self.tmp.cleanup()
+
+    def test_log_and_query(self):
+        results = [{'column': 'e', 'pattern': 'email', 'matches_found': 2},
+                   {'column': 'p', 'pattern': 'phone', 'matches_found': 1}]
+        history_logger.log_scan_history(results, 66.67, ["Anonymization not verified."], "a.csv")
+        history_logger.log_scan_history(results[:1], 100.0, [], "b.csv",
+                                        anon_report={'total_pii_values': 2, 'anonymized_count': 2,
+                                                     'anonymization_rate': 100.0, 'verification_passed': True})
+
+        history = history_logger.load_scan_history()
+        self.assertEqual(list(history.columns), history_logger.HISTORY_COLUMNS)
+        self.assertEqual(history['source'].tolist(), ['a.csv', 'b.csv'])
+        self.assertEqual(history['pii_types'].tolist(), ['email, phone', 'email'])
+        self.assertEqual(len(history_logger.load_scan_history(source='b.csv')), 1)
+        self.assertEqual(len(history_logger.load_scan_history(end=date(2000, 1, 1))), 0)
+
+        freq = history_logger.pii_type_frequencies()
+        self.assertEqual(dict(zip(freq['pii_type'], freq['scans'])), {'email': 2, 'phone': 1})
+        trend = history_logger.score_trend()
+        self.assertEqual(trend['scans'].sum(), 2)
+        self.assertEqual(history_logger.violation_frequencies()['scans'].tolist(), [1])
+
+    def test_imports_legacy_csv(self):
+        pd.DataFrame([{
+            "timestamp": "2025-01-01T10:00:00", "source": "old.csv", "compliance_score": 50.0,
+            "violations": "None", "pii_types": "email, SSN", "total_pii_values": 0,
+            "anonymized_count": 0, "anonymization_rate": 0.0, "verification_passed": False
+        }]).to_csv(history_logger.HISTORY_FILE, index=False)
+        history = history_logger.load_scan_history()
+        self.assertEqual(history['source'].tolist(), ['old.csv'])
+        self.assertEqual(len(history_logger.pii_type_frequencies(source='old.csv')), 2)
+
+    def test_legacy_csv_imported_once_by_concurrent_openers(self):
+        pd.DataFrame([{"timestamp": "2025-01-01T10:00:00", "source": "old.csv", "compliance_score": 50.0}]).to_csv(
+            history_logger.HISTORY_FILE, index=False)
+        barrier = threading.Barrier(8)
+
+        def open_history():
+            barrier.wait()
+            history_logger._connect().close()
+
+        threads = [threading.Thread(target=open_history) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(history_logger.load_scan_history()['source'].tolist(), ['old.csv'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# test_mapping_store.py
+
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+from modules.mapping_store import SqliteMappingStore, JsonMappingStore
+from modules.anonymize_data import pseudonymize_series
+
+class TestMappingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sqlite_store_inserts_only_new_keys(self):
+        store = SqliteMappingStore(os.path.join(self.tmp.name, "map.db"))
+        store.put_many({"USER|a": "USER_1"})
+        store.put_many({"USER|a": "USER_other", "USER|b": "USER_2"})
+        self.assertEqual(store.get_many(["USER|a", "USER|b", "USER|c"]), {"USER|a": "USER_1", "USER|b": "USER_2"})
+        self.assertEqual(len(store), 2)
+        store.close()
+
+    def test_sqlite_store_imports_legacy_json(self):
+        legacy = os.path.join(self.tmp.name, "map.json")
+        with open(legacy, "w") as f:
+            json.dump({"USER|x": "USER_legacy"}, f)
+        store = SqliteMappingStore(os.path.join(self.tmp.name, "map.db"), legacy_json=legacy)
+        self.assertEqual(store.get_many(["USER|x"]), {"USER|x": "USER_legacy"})
+        store.close()
+
+    def test_backends_give_same_pseudonyms(self):
+        series = pd.Series(["alice", "bob", "alice", None])
+        sqlite_store = SqliteMappingStore(os.path.join(self.tmp.name, "map.db"))
+        json_store = JsonMappingStore(os.path.join(self.tmp.name, "map.json"))
+        a = pseudonymize_series(series, store=sqlite_store)
+        b = pseudonymize_series(series, store=json_store)
+        self.assertTrue(a.equals(b))
+        self.assertEqual(a[0], a[2])
+        self.assertEqual(len(sqlite_store), 2)
+        sqlite_store.close()
+
+if __name__ == '__main__':
+    unittest.main()
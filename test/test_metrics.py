@@ -0,0 +1,79 @@
+# test_metrics.py
+
+import os
+import tempfile
+import threading
+import unittest
+import pandas as pd
+from modules import metrics, history_logger
+from modules.pii_detector import detect_sensitive_data
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'email': ['a@example.com', 'nobody', 'b@example.org'],
+            'phone': ['+251912345678', 'n/a', 'SSN 123-45-6789'],
+        })
+
+    def test_stage_and_count_are_noops_without_a_run(self):
+        self.assertIsNone(metrics.current())
+        with metrics.stage("load"):
+            metrics.count("rows_scanned", 3)
+        self.assertIsNone(metrics.current())
+
+    def test_collect_records_stages_counters_and_pattern_time(self):
+        with metrics.collect(source="t.csv", pattern_timing=True) as run:
+            with metrics.stage("detect"):
+                results = detect_sensitive_data(self.df)
+        self.assertEqual(results, detect_sensitive_data(self.df))
+        record = run.record()
+        self.assertEqual(record["source"], "t.csv")
+        self.assertIn("detect", record["stages"])
+        self.assertEqual(record["counters"]["rows_scanned"], 3)
+        self.assertEqual(record["counters"]["cells_scanned"], 6)
+        self.assertIn("email", record["pattern_seconds"])
+
+    def test_concurrent_runs_are_kept_apart(self):
+        barrier = threading.Barrier(2)
+        records = {}
+
+        def scan(name, rows):
+            with metrics.collect(source=name) as run:
+                barrier.wait()
+                metrics.count("rows_scanned", rows)
+                barrier.wait()
+            records[name] = run.record()
+
+        threads = [threading.Thread(target=scan, args=(f"t{i}.csv", 10 ** i)) for i in (1, 2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(records["t1.csv"]["counters"], {"rows_scanned": 10})
+        self.assertEqual(records["t2.csv"]["counters"], {"rows_scanned": 100})
+        self.assertIsNone(metrics.current())
+
+    def test_profile_dump(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with metrics.collect(profile_dir=tmp):
+                detect_sensitive_data(self.df)
+            names = os.listdir(tmp)
+            self.assertTrue(any(n.endswith(".prof") for n in names))
+            self.assertTrue(any(n.endswith("_memory.txt") for n in names))
+
+    def test_metrics_stored_next_to_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = history_logger.HISTORY_DB
+            history_logger.HISTORY_DB = os.path.join(tmp, "history.db")
+            try:
+                with metrics.collect(source="t.csv") as run:
+                    metrics.count("bytes_read", 10)
+                history_logger.log_scan_metrics(run.record())
+                stored = history_logger.load_scan_metrics(source="t.csv")
+            finally:
+                history_logger.HISTORY_DB = saved
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(stored[0]["counters"], {"bytes_read": 10})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+# test_ner_detector.py
+
+import unittest
+import pandas as pd
+from modules.pii_detector import free_text_columns
+
+try:
+    import spacy
+    spacy.load("en_core_web_sm")
+except Exception:
+    spacy = None
+
+class TestNerDetector(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'notes': ['Barack Obama met executives from Google in Paris last week.',
+                      'The weather was fine and nobody called back.',
+                      'Barack Obama met executives from Google in Paris last week.'],
+            'email': ['a@example.com', 'b@example.com', 'c@example.com'],
+            'amount': [1, 2, 3],
+        })
+
+    def test_only_prose_columns_are_free_text(self):
+        self.assertEqual(free_text_columns(self.df), ['notes'])
+
+    @unittest.skipIf(spacy is None, "spaCy or en_core_web_sm not installed")
+    def test_entities_in_result_schema(self):
+        from modules.ner_detector import detect_entities, load_model
+        results = detect_entities(self.df, batch_size=2)
+        found = {r['pattern']: r['matches_found'] for r in results}
+        self.assertEqual(found.get('person'), 2)
+        self.assertEqual({r['column'] for r in results}, {'notes'})
+        self.assertIs(load_model(), load_model())
+        self.assertIn('ner', load_model().pipe_names)
+        self.assertNotIn('parser', load_model().pipe_names)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# test_pattern_registry.py
+
+import unittest
+import pandas as pd
+from modules.pattern_registry import (patterns, luhn_valid, probe_backtracking, register_pattern,
+                                      load_custom_patterns, pattern_stats, VALIDATORS)
+from modules.pii_detector import detect_sensitive_data, find_spans
+
+class TestPatternRegistry(unittest.TestCase):
+    def tearDown(self):
+        load_custom_patterns({}, replace=True)
+        for label in ('employee_id', 'slow', 'secret', 'repeat'):
+            patterns.pop(label, None)
+            VALIDATORS.pop(label, None)
+
+    def test_luhn(self):
+        self.assertTrue(luhn_valid('4111 1111 1111 1111'))
+        self.assertFalse(luhn_valid('4111 1111 1111 1112'))
+        self.assertFalse(luhn_valid('1234'))
+
+    def test_cards_must_pass_luhn(self):
+        df = pd.DataFrame({'card': ['4111-1111-1111-1111', '4111-1111-1111-1112', 'none']})
+        self.assertEqual(detect_sensitive_data(df),
+                         [{'column': 'card', 'pattern': 'Credit Card', 'matches_found': 1}])
+        self.assertEqual(find_spans('pay 4111 1111 1111 1112 now'), [])
+
+    def test_backtracking_probe(self):
+        self.assertIsNone(probe_backtracking(patterns['Credit Card']))
+        self.assertIsNotNone(probe_backtracking(r'(a+)+$'))
+        with self.assertRaises(ValueError):
+            register_pattern('slow', r'(a+)+$')
+        self.assertNotIn('slow', patterns)
+
+    def test_custom_patterns_from_rules(self):
+        rejected = load_custom_patterns({"custom_patterns": {"employee_id": r"EMP-\d{6}", "slow": r"(\w+\s?)+$"}})
+        self.assertEqual(list(rejected), ['slow'])
+        df = pd.DataFrame({'staff': ['EMP-123456', 'EMP-12']})
+        self.assertIn({'column': 'staff', 'pattern': 'employee_id', 'matches_found': 1}, detect_sensitive_data(df))
+        self.assertGreaterEqual(pattern_stats()['employee_id']['cells'], 1)
+
+    def test_patterns_must_work_in_the_combined_alternation(self):
+        # A global flag or a numbered backreference compiles alone but not (or wrongly) once combined
+        rejected = load_custom_patterns({"custom_patterns": {"secret": r"(?i)secret-\d+", "repeat": r"(\w)\1{3}-X"}})
+        self.assertEqual(sorted(rejected), ['repeat', 'secret'])
+        self.assertNotIn('secret', patterns)
+        register_pattern('repeat', r"(?P<c>\w)(?P=c){3}-X")
+        df = pd.DataFrame({'code': ['aaaa-X', 'abcd-X'], 'email': ['a@example.com', None]})
+        counts = {(r['column'], r['pattern']): r['matches_found'] for r in detect_sensitive_data(df)}
+        self.assertEqual(counts[('code', 'repeat')], 1)
+        self.assertEqual(counts[('email', 'email')], 1)
+
+    def test_reload_replaces_the_custom_patterns(self):
+        builtin = dict(patterns)
+        load_custom_patterns({"custom_patterns": {"employee_id": r"EMP-\d{6}", "Credit Card": r"CC-\d{4}"}},
+                             replace=True)
+        self.assertEqual(patterns['Credit Card'], r"CC-\d{4}")
+        self.assertNotIn('Credit Card', VALIDATORS)
+        rejected = load_custom_patterns({"custom_patterns": {"secret": r"(?i)secret"}}, replace=True)
+        self.assertEqual(list(rejected), ['secret'])
+        # Labels no longer configured are gone; an overridden built-in is back in its place
+        self.assertEqual(patterns, builtin)
+        self.assertEqual(list(patterns), list(builtin))
+        self.assertIs(VALIDATORS['Credit Card'], luhn_valid)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,11 @@ import sys
 import os
 from modules.pii_detector import detect_sensitive_data
 
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
 #Add the modules directory to the Python path
 sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__), '../modules')))
 
@@ -22,5 +27,52 @@ class TestPIIDetector(unittest.TestCase):
         self.assertIn('email', patterns_found)
         self.assertIn('phone', patterns_found)
 
+    def test_overlapping_patterns_counted_per_cell(self):
+        df = pd.DataFrame({
+            'mixed': ['+251912345678@mail.com', 'AB12345678 and John Doe', '123-45-6789', None],
+        })
+        counts = {r['pattern']: r['matches_found'] for r in detect_sensitive_data(df)}
+        self.assertEqual(counts['email'], 1)
+        self.assertEqual(counts['phone'], 1)
+        self.assertEqual(counts['national_id'], 1)
+        self.assertEqual(counts['SSN'], 1)
+        self.assertIn('Name', counts)
+
+    def test_parallel_matches_serial(self):
+        df = pd.DataFrame({
+            'email': ['a@example.com', 'b@example.com', 'none', 'c@example.org', None],
+            'text': ['call +251912345678', 'SSN 123-45-6789', 'John Doe', '', 'AB12345678'],
+        })
+        expected = detect_sensitive_data(df)
+        self.assertEqual(detect_sensitive_data(df, workers=2, partition_size=2), expected)
+
+    def test_prescreen_and_sample_only(self):
+        df = pd.DataFrame({
+            'flag': [True, False] * 50,
+            'email': ['user@example.com', 'n/a'] * 50,
+        })
+        self.assertEqual(detect_sensitive_data(df, prescreen=True, sample_size=20), detect_sensitive_data(df))
+        estimates = detect_sensitive_data(df, sample_only=True, sample_size=40)
+        self.assertEqual([r['column'] for r in estimates], ['email'])
+        self.assertTrue(estimates[0]['estimated'])
+        self.assertLessEqual(estimates[0]['ci_low'], 50)
+        self.assertGreaterEqual(estimates[0]['ci_high'], 50)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow not installed")
+    def test_arrow_strings_match_single_pass_engine(self):
+        from modules.pii_detector import _count_column, _count_matches, patterns
+        items = tuple(patterns.items())
+        values = ['+251912345678@mail.com', 'AB12345678 and John Doe', '123-45-6789', None,
+                  '4111 1111 1111 1111', '4111 1111 1111 1112', 'pay 4111-1111-1111-1111',
+                  # Non-ASCII neighbours: \b and \d are ASCII in both engines
+                  '\u0663John Doe', '\u00e9123-45-6789', '123-45-6789\u00e9', '\u0661\u0662\u0663-45-6789',
+                  'Jos\u00e9 Mart\u00ed', '\u00dcnal@example.com', '4111 1111 1111 1111\u00e9'] * 3
+        expected = _count_matches(values, items)
+        self.assertEqual(expected['Credit Card'], 9)
+        self.assertEqual((expected['SSN'], expected['Name']), (9, 6))
+        for dtype in ('string[pyarrow]', 'str', object):
+            self.assertEqual(_count_column(pd.Series(values, dtype=dtype), items), expected)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,47 @@
+# test_report_generator.py
+
+import os
+import tempfile
+import unittest
+from modules.report_generator import (generate_pdf_report, generate_csv_report, submit_reports,
+                                      LazyReports, _aggregate_by_type)
+
+class TestReportGenerator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.results = [{'column': f'col_{i}', 'pattern': 'email' if i % 3 else 'phone', 'matches_found': i + 1}
+                        for i in range(3000)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_aggregate_by_type(self):
+        self.assertEqual(_aggregate_by_type(self.results[:5]), [('email', 3, 10), ('phone', 2, 5)])
+
+    def test_pdf_is_capped_and_paginated(self):
+        small = generate_pdf_report(self.results, 50.0, ["Too many PII types"], output_dir=self.tmp.name,
+                                    max_findings=100)
+        size_small = os.path.getsize(small)
+        full = generate_pdf_report(self.results, 50.0, ["Too many PII types"], output_dir=self.tmp.name,
+                                   max_findings=3000)
+        self.assertGreater(os.path.getsize(full), size_small)
+
+    def test_non_latin_text_does_not_fail(self):
+        path = generate_pdf_report([{'column': 'ስም', 'pattern': 'Name', 'matches_found': 1}], 100.0, [],
+                                   output_dir=self.tmp.name)
+        self.assertTrue(os.path.exists(path))
+
+    def test_background_and_lazy_rendering(self):
+        future = submit_reports(self.results[:10], 100.0, [], output_dir=os.path.join(self.tmp.name, "bg"))
+        paths = future.result(timeout=30)
+        self.assertTrue(all(os.path.exists(p) for p in paths.values()))
+
+        lazy_dir = os.path.join(self.tmp.name, "lazy")
+        lazy = LazyReports(self.results[:10], 100.0, [], output_dir=lazy_dir)
+        self.assertFalse(os.path.exists(lazy_dir))
+        self.assertEqual(lazy.csv(), generate_csv_report(self.results[:10], 100.0, [], output_dir=lazy_dir))
+        self.assertFalse(os.path.exists(os.path.join(lazy_dir, "compliance_report.pdf")))
+        self.assertTrue(os.path.exists(lazy.pdf()))
+
+if __name__ == '__main__':
+    unittest.main()
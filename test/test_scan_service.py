@@ -0,0 +1,129 @@
+# test_scan_service.py
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+import pandas as pd
+from modules import history_logger, mapping_store
+from modules.pattern_registry import load_custom_patterns, patterns
+from modules.scan_service import ScanService, make_server
+
+CSV = b"email,n\nx@example.com,1\ny@example.com,2\n"
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+class TestScanService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rules = os.path.join(self.tmp.name, "rules.json")
+        with open(self.rules, "w") as f:
+            json.dump({"max_pii_fields": 2, "allowed_pii_types": ["email"], "anonymization_required": True}, f)
+        self._saved = history_logger.HISTORY_DB
+        history_logger.HISTORY_DB = os.path.join(self.tmp.name, "history.db")
+        self._saved_map = mapping_store.SQLITE_MAP_PATH
+        mapping_store.SQLITE_MAP_PATH = os.path.join(self.tmp.name, "map.db")
+        self.service = ScanService(self.rules, workers=1)
+
+    def tearDown(self):
+        self.service.shutdown()
+        load_custom_patterns({}, replace=True)
+        history_logger.HISTORY_DB = self._saved
+        mapping_store.SQLITE_MAP_PATH = self._saved_map
+        self.tmp.cleanup()
+
+    def test_job_result_and_duplicate_upload_cached(self):
+        job = self.service.submit(CSV, "data.csv")
+        self.assertTrue(job["done"].wait(30))
+        self.assertEqual(job["status"], "done")
+        result = job["result"]
+        self.assertEqual(result["rows"], 2)
+        self.assertEqual(result["results"][0]["pattern"], "email")
+        self.assertEqual(result["score"], 100.0)
+        self.assertEqual(result["anon_report"]["anonymized_count"], 2)
+
+        again = self.service.submit(CSV, "other.csv")
+        self.assertTrue(again["cached"])
+        self.assertEqual(again["status"], "done")
+        self.assertIs(again["result"], result)
+        self.assertEqual(self.service.status()["cached_results"], 1)
+
+        # Different options are a different cache entry
+        plain = self.service.submit(CSV, "data.csv", anonymize=False)
+        self.assertFalse(plain["cached"])
+        plain["done"].wait(30)
+        self.assertIsNone(plain["result"]["anon_report"])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow not installed")
+    def test_parquet_upload_scanned_as_arrow_table(self):
+        path = os.path.join(self.tmp.name, "data.parquet")
+        pd.DataFrame({'email': ['x@example.com', None, 'y@example.com'],
+                      'card': [4111111111111111, 5, 4012888888881881]}).to_parquet(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        plain = self.service.scan_bytes(data, "data.parquet", anonymize=False)
+        full = self.service.scan_bytes(data, "data.parquet", anonymize=True)
+        self.assertEqual(plain["rows"], 3)
+        self.assertEqual(plain["results"], full["results"])
+        self.assertEqual({r["column"] for r in plain["results"]}, {"email", "card"})
+
+    def test_failures_and_queue_bound(self):
+        job = self.service.submit(b'a,b\n"unterminated\n', "broken.csv")
+        job["done"].wait(30)
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("error", job)
+        with self.assertRaises(ValueError):
+            self.service.submit(CSV, "data.exe")
+
+        self.service.max_queued = 0
+        with self.assertRaises(OverflowError):
+            self.service.submit(b"x,y\n1,2\n", "new.csv")
+
+    def test_reload_drops_removed_custom_patterns(self):
+        with open(self.rules, "w") as f:
+            json.dump({"max_pii_fields": 2, "custom_patterns": {"ticket": r"TCK-\d{4}", "bad": r"(\w)\1"}}, f)
+        self.assertEqual(list(self.service.reload_rules()), ["bad"])
+        self.assertIn("ticket", patterns)
+        job = self.service.submit(b"t\nTCK-1234\n", "t.csv", anonymize=False)
+        job["done"].wait(30)
+        self.assertEqual(job["result"]["results"][0]["pattern"], "ticket")
+
+        with open(self.rules, "w") as f:
+            json.dump({"max_pii_fields": 2}, f)
+        self.assertEqual(self.service.reload_rules(), {})
+        self.assertNotIn("ticket", patterns)
+        job = self.service.submit(b"t\nTCK-1234\n", "t.csv", anonymize=False)
+        job["done"].wait(30)
+        self.assertFalse(job["cached"])
+        self.assertEqual(job["result"]["results"], [])
+
+    def test_http_api(self):
+        server = make_server(self.service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            request = urllib.request.Request(f"{base}/jobs?filename=data.csv&wait=1", data=CSV, method="POST")
+            with urllib.request.urlopen(request) as response:
+                job = json.load(response)
+            self.assertEqual(job["status"], "done")
+            self.assertEqual(job["result"]["results"][0]["matches_found"], 2)
+
+            with urllib.request.urlopen(f"{base}/jobs/{job['job_id']}") as response:
+                self.assertEqual(json.load(response)["job_id"], job["job_id"])
+            with urllib.request.urlopen(f"{base}/health") as response:
+                self.assertEqual(json.load(response)["status"], "ok")
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(f"{base}/jobs/missing")
+            self.assertEqual(ctx.exception.code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# test_startup.py
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules only the code paths that need them may import
+HEAVY_MODULES = ["pandas", "numpy", "fpdf", "openpyxl", "pyarrow", "spacy"]
+# Generous ceiling for `import main` in a fresh interpreter (it takes well under 0.2s)
+IMPORT_BUDGET_SECONDS = 1.0
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+SCAN_PROBE = """
+import json, sys
+import main
+run = main.scan_file(%r, {"anonymization_required": False}, %r, report_mode="none")
+print(json.dumps({"found": len(run["results"]), "pandas": "pandas" in sys.modules}))
+"""
+
+class TestStartup(unittest.TestCase):
+    def test_cli_import_is_light_and_within_budget(self):
+        out = subprocess.run([sys.executable, "-c", PROBE % HEAVY_MODULES], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        probe = json.loads(out.strip().splitlines()[-1])
+        self.assertEqual(probe["loaded"], [])
+        self.assertLess(probe["seconds"], IMPORT_BUDGET_SECONDS)
+
+    def _scan_in_fresh_interpreter(self, path, output_dir):
+        out = subprocess.run([sys.executable, "-c", SCAN_PROBE % (path, output_dir)], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+    def test_lite_csv_scan_does_not_import_pandas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.csv")
+            with open(path, "w") as f:
+                f.write("email,note\nx@example.com,a\ny@example.com,b\n")
+            self.assertEqual(self._scan_in_fresh_interpreter(path, os.path.join(tmp, "out")),
+                             {"found": 1, "pandas": False})
+
+    @unittest.skipIf(pyarrow is None, "pyarrow not installed")
+    def test_arrow_scan_does_not_import_pandas(self):
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+        table = pyarrow.table({'email': ['x@example.com', 'y@example.com'], 'note': ['a', 'b']})
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, write in (("data.parquet", pq.write_table), ("data.feather", feather.write_feather)):
+                path = os.path.join(tmp, name)
+                write(table, path)
+                self.assertEqual(self._scan_in_fresh_interpreter(path, os.path.join(tmp, "out")),
+                                 {"found": 1, "pandas": False})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# test_text_redactor.py
+
+import unittest
+import pandas as pd
+from modules.pattern_registry import patterns, register_pattern
+from modules.text_redactor import redact_text, redact_text_series, mask_span
+from modules.anonymize_data import anonymize_dataset
+
+class TestTextRedactor(unittest.TestCase):
+    def tearDown(self):
+        for label in ('employee_id', 'tag'):
+            patterns.pop(label, None)
+
+    def test_format_preserving_masks(self):
+        self.assertEqual(mask_span('phone', '+1-918-306-3467'), '+*-***-***-*467')
+        self.assertEqual(mask_span('email', 'jane@example.com'), 'j***@example.com')
+        self.assertEqual(mask_span('Name', 'Nelson Mandela'), 'N***** M******')
+
+    def test_all_types_in_one_pass(self):
+        text = 'Nelson Mandela: +251912345678, mail: jane@example.com; SSN: 123-45-6789.'
+        out, counts = redact_text(text)
+        self.assertEqual(out, 'N***** M******: +*********678, mail: j***@example.com; SSN: ***-**-6789.')
+        self.assertEqual(counts, {'Name': 1, 'phone': 1, 'email': 1, 'SSN': 1})
+        self.assertEqual(redact_text(text, types=['SSN'])[1], {'SSN': 1})
+
+    def test_prose_paragraph_end_to_end(self):
+        text = ("Sure, I have given you my phone number which is +1-918-306-3467x05856. It's essential "
+                "to maintain privacy. I would choose Nelson Mandela, and you can also call +44 20 7946 0958.")
+        df = pd.DataFrame({'text': [text, 'no numbers here at all']})
+        detections = [{'column': 'text', 'pattern': 'phone', 'matches_found': 1}]
+        out, report = anonymize_dataset(df, detections, method_config={'phone': 'redact_text'})
+        self.assertEqual(out['text'][0], "Sure, I have given you my phone number which is +*-***-***-*******856. "
+                                         "It's essential to maintain privacy. I would choose N***** M******, "
+                                         "and you can also call +** ** **** *958.")
+        self.assertEqual(out['text'][1], 'no numbers here at all')
+        self.assertEqual(report['spans_by_type'], {'phone': 2, 'Name': 1})
+        self.assertTrue(report['verification_passed'])
+
+    def test_text_without_pii_is_unchanged(self):
+        self.assertEqual(redact_text('nothing; to: see, here'), ('nothing; to: see, here', {}))
+
+    def test_custom_patterns_are_redacted(self):
+        register_pattern('employee_id', r'EMP-\d{6}')
+        self.assertEqual(redact_text('id: EMP-123456.'), ('id: ***-******.', {'employee_id': 1}))
+
+    def test_series_counts_every_row(self):
+        series = pd.Series(['ring: +251912345678', 'ring: +251912345678', None, 'plain'])
+        counts = {}
+        out, spans = redact_text_series(series, counts=counts)
+        self.assertEqual(out.tolist()[:2], ['ring: +*********678'] * 2)
+        self.assertTrue(pd.isna(out[2]))
+        self.assertEqual(out[3], 'plain')
+        self.assertEqual(spans, {'phone': 2})
+        self.assertEqual(counts, {'pii': 2, 'changed': 2})
+
+    def test_redact_text_method_in_anonymize_dataset(self):
+        df = pd.DataFrame({'notes': ['reach: jane@example.com', 'no-pii']})
+        detections = [{'column': 'notes', 'pattern': 'email', 'matches_found': 1}]
+        out, report = anonymize_dataset(df, detections, method_config={'email': 'redact_text'})
+        self.assertEqual(out['notes'].tolist(), ['reach: j***@example.com', 'no-pii'])
+        self.assertEqual(report['spans_by_type'], {'email': 1})
+        self.assertTrue(report['verification_passed'])
+
+        # The mask keeps '<' and '>', so the output still matches: verification must fail
+        register_pattern('tag', r'<[^<>]+>')
+        df = pd.DataFrame({'notes': ['see <secret>', 'none']})
+        detections = [{'column': 'notes', 'pattern': 'tag', 'matches_found': 1}]
+        out, report = anonymize_dataset(df, detections, method_config={'tag': 'redact_text'})
+        self.assertEqual(out['notes'][0], 'see <******>')
+        self.assertEqual((report['total_pii_values'], report['anonymized_count']), (1, 0))
+        self.assertFalse(report['verification_passed'])
+
+if __name__ == '__main__':
+    unittest.main()